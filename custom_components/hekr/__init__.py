@@ -4,19 +4,25 @@ __all__ = (
     "async_setup",
     "async_setup_entry",
     "async_unload_entry",
+    "async_remove_entry",
     "CONFIG_SCHEMA",
 )
 
 import asyncio
 import logging
-import socket
 from typing import Optional, TYPE_CHECKING
 
 from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
-from homeassistant.const import CONF_USERNAME, CONF_DEVICE_ID
+from homeassistant.const import (
+    CONF_USERNAME,
+    CONF_DEVICE_ID,
+    CONF_CUSTOMIZE,
+    CONF_PROTOCOL,
+    CONF_HOST,
+)
 from homeassistant.core import callback
-from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.typing import ConfigType
 
 from hekrapi.exceptions import HekrAPIException, AuthenticationFailedException
@@ -27,8 +33,10 @@ from .const import (
     CONF_DEVICES,
     CONF_ACCOUNTS,
     CONF_USE_MODEL_FROM_PROTOCOL,
+    CONF_STARTUP_CONCURRENCY,
     CONF_DEVICE,
     CONF_ACCOUNT,
+    PROTOCOL_AUTO,
 )
 from .schemas import CONFIG_SCHEMA
 
@@ -40,17 +48,22 @@ _LOGGER = logging.getLogger(__name__)
 
 
 @callback
-def _find_existing_entry(
-    hass: HomeAssistant, setup_type: str, item_id: str
-) -> Optional[ConfigEntry]:
-    existing_entries = hass.config_entries.async_entries(DOMAIN)
-    item_id_key = CONF_DEVICE_ID if setup_type == CONF_DEVICE else CONF_USERNAME
-    for config_entry in existing_entries:
-        if (
-            setup_type in config_entry.data
-            and config_entry.data[setup_type][item_id_key] == item_id
+def _index_existing_entries(hass: HomeAssistant) -> dict[tuple[str, str], ConfigEntry]:
+    """
+    Index existing config entries by their setup type and item ID.
+    :param hass: Home Assistant object
+    :return: (setup type, device ID or username) -> config entry
+    """
+    existing_entries = {}
+    for config_entry in hass.config_entries.async_entries(DOMAIN):
+        for setup_type, item_id_key in (
+            (CONF_DEVICE, CONF_DEVICE_ID),
+            (CONF_ACCOUNT, CONF_USERNAME),
         ):
-            return config_entry
+            if setup_type in config_entry.data:
+                item_id = config_entry.data[setup_type][item_id_key]
+                existing_entries.setdefault((setup_type, item_id), config_entry)
+    return existing_entries
 
 
 async def async_setup(hass: HomeAssistant, yaml_config: ConfigType) -> bool:
@@ -63,9 +76,14 @@ async def async_setup(hass: HomeAssistant, yaml_config: ConfigType) -> bool:
 
     hekr_data_obj: "HekrData" = HekrData(hass)
     hekr_data_obj.use_model_from_protocol = domain_config[CONF_USE_MODEL_FROM_PROTOCOL]
+    hekr_data_obj.startup.concurrency = domain_config[CONF_STARTUP_CONCURRENCY]
+    hekr_data_obj.protocol_prober.concurrency = domain_config[CONF_STARTUP_CONCURRENCY]
+    hekr_data_obj.devices_customize = domain_config.get(CONF_CUSTOMIZE, {})
 
     hass.data[DOMAIN] = hekr_data_obj
 
+    existing_entries = _index_existing_entries(hass)
+
     devices_config = domain_config.get(CONF_DEVICES)
     if devices_config:
 
@@ -75,7 +93,7 @@ async def async_setup(hass: HomeAssistant, yaml_config: ConfigType) -> bool:
 
             _LOGGER.debug('Device "%s" entry from YAML', device_id)
 
-            existing_entry = _find_existing_entry(hass, CONF_DEVICE, device_id)
+            existing_entry = existing_entries.get((CONF_DEVICE, device_id))
             if existing_entry:
                 if existing_entry.source == SOURCE_IMPORT:
                     hekr_data_obj.devices_config_yaml[device_id] = device_cfg
@@ -113,7 +131,7 @@ async def async_setup(hass: HomeAssistant, yaml_config: ConfigType) -> bool:
 
             _LOGGER.debug('Account "%s" entry from YAML', account_id)
 
-            existing_entry = _find_existing_entry(hass, CONF_ACCOUNT, account_id)
+            existing_entry = existing_entries.get((CONF_ACCOUNT, account_id))
             if existing_entry:
                 if existing_entry.source == SOURCE_IMPORT:
                     hekr_data_obj.accounts_config_yaml[account_id] = account_cfg
@@ -158,8 +176,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN] = hekr_data_obj
 
     try:
-        existing_entries = hass.config_entries.async_entries(DOMAIN)
-
         if CONF_DEVICE in conf:
 
             device_cfg = conf[CONF_DEVICE]
@@ -177,55 +193,58 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                     )
                     return False
 
-            for other_config_entry in existing_entries:
-                if other_config_entry.entry_id == entry.entry_id:
-                    continue
-
-                other_conf = other_config_entry.data
-                if CONF_ACCOUNT in other_conf:
-                    account_id = other_conf[CONF_ACCOUNT][CONF_USERNAME]
-                    account_devices = hekr_data_obj.get_account_devices(account_id)
-                    if device_id in account_devices:
-                        _LOGGER.info(
-                            f'Detected local config override for device "{device_id}"'
-                            f' with account "{account_id}" set up'
-                        )
-
-                        cancel_cloud_listener = True
-                        for other_device_id in account_devices.keys():
-                            if other_device_id != device_id:
-                                _LOGGER.debug(
-                                    f"Detected other devices on account"
-                                    f' "{account_id}", will not cancel listener.',
-                                )
-                                cancel_cloud_listener = False
-                                break
-
-                        if cancel_cloud_listener:
-                            device: Optional["Device"] = hekr_data_obj.devices.get(
-                                device_id
-                            )
-                            if device and device.connector:
-                                if (
-                                    device.connector.listener
-                                    and device.connector.listener.is_running
-                                ):
-                                    device.connector.listener.stop()
-
-                                await device.close_connection()
-
-                            del device
+            account_id = hekr_data_obj.get_device_account(device_id)
+            if account_id is not None:
+                _LOGGER.info(
+                    f'Detected local config override for device "{device_id}"'
+                    f' with account "{account_id}" set up'
+                )
 
-            _LOGGER.debug('Setting up config entry for device with ID "%s"', device_id)
+                if len(hekr_data_obj.get_account_devices(account_id)) > 1:
+                    _LOGGER.debug(
+                        f"Detected other devices on account"
+                        f' "{account_id}", will not cancel listener.',
+                    )
+                else:
+                    device: Optional["Device"] = hekr_data_obj.devices.get(device_id)
+                    if device and device.connector:
+                        if (
+                            device.connector.listener
+                            and device.connector.listener.is_running
+                        ):
+                            device.connector.listener.stop()
+
+                        await device.close_connection()
+
+                    del device
+
+            if device_cfg[CONF_PROTOCOL] == PROTOCOL_AUTO:
+                protocol_id = await hekr_data_obj.detect_local_protocol(device_cfg)
+                if protocol_id is None:
+                    raise ConfigEntryNotReady(
+                        'Could not detect protocol of device "%s"' % device_id
+                    )
 
-            device = hekr_data_obj.create_local_device(device_cfg)
+                _LOGGER.info(
+                    'Detected protocol "%s" on device "%s"', protocol_id, device_id
+                )
+                device_cfg = {**device_cfg, CONF_PROTOCOL: protocol_id}
+
+            host_devices = hekr_data_obj.get_host_devices(device_cfg[CONF_HOST])
+            host_devices.discard(device_id)
+            if host_devices:
+                _LOGGER.info(
+                    'Device "%s" shares host "%s" with devices %s, their frames are '
+                    "told apart by device ID",
+                    device_id,
+                    device_cfg[CONF_HOST],
+                    ", ".join(sorted(host_devices)),
+                )
+
+            _LOGGER.debug('Setting up config entry for device with ID "%s"', device_id)
 
-            try:
-                await device.open_connection()
-                hekr_data_obj.refresh_connections()
-            except socket.gaierror as e:
-                _LOGGER.error("Invalid hostname or address provided (error: %s)", e)
-                raise ConfigEntryNotReady
+            hekr_data_obj.create_local_device(device_cfg)
+            hekr_data_obj.schedule_device_connection(device_id)
 
             # await hekr_data.create_device_registry_entry(device, config_entry.entry_id)
 
@@ -291,12 +310,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
         devices_to_unload = hekr_data_obj.collect_devices_for_entry(entry)
 
-        for device_id in devices_to_unload:
-            _LOGGER.debug("Unloaded device from data: %s", device_id)
-            # await hekr_data.delete_device_registry_entry(device_id)
-            await hekr_data_obj.cleanup_device(device_id, with_refresh=False)
-
-        hekr_data_obj.refresh_connections()
+        _LOGGER.debug("Unloading devices from data: %s", devices_to_unload)
+        # await hekr_data.delete_device_registry_entry(device_id)
+        await hekr_data_obj.cleanup_devices(devices_to_unload)
 
         if CONF_ACCOUNT in entry.data:
             account_id = entry.data[CONF_ACCOUNT][CONF_USERNAME]
@@ -310,5 +326,15 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    if CONF_ACCOUNT not in entry.data:
+        return
+
+    hekr_data_obj: Optional["HekrData"] = hass.data.get(DOMAIN)
+    if hekr_data_obj is not None:
+        account_id = entry.data[CONF_ACCOUNT][CONF_USERNAME]
+        await hekr_data_obj.account_cache.async_remove(account_id)
+
+
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     pass
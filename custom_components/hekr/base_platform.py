@@ -8,7 +8,8 @@ __all__ = (
 import asyncio
 from collections import OrderedDict
 from datetime import timedelta
-from typing import Optional, TYPE_CHECKING, Any, Union, Type
+from functools import partial
+from typing import Optional, TYPE_CHECKING, Any, Union, Type, Hashable
 
 from homeassistant.config_entries import ConfigEntry
 import voluptuous as vol
@@ -27,8 +28,9 @@ from homeassistant.const import (
     CONF_DEVICE_ID,
     CONF_USERNAME,
     CONF_PLATFORM,
+    CONF_CUSTOMIZE,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.typing import ConfigType
 
@@ -43,13 +45,18 @@ from .const import (
     CONF_DEVICE,
     CONF_ACCOUNT,
     CONF_DOMAINS,
+    MONITORED_CONDITIONS_ALL,
+    PROTOCOL_DEADBAND,
+    PROTOCOL_DEADBAND_RELATIVE,
+    PROTOCOL_MIN_INTERVAL,
+    PROTOCOL_MAX_AGE,
 )
 from .schemas import BASE_PLATFORM_SCHEMA, test_for_list_correspondence
 from .supported_protocols import SUPPORTED_PROTOCOLS
 
 if TYPE_CHECKING:
     from .hekr_data import HekrData
-    from hekrapi import MessageID, CommandData, logging
+    from hekrapi import CommandData, DeviceResponseState, logging
 
 
 class HekrEntity(Entity):
@@ -78,6 +85,15 @@ class HekrEntity(Entity):
 
         self._attributes = None
         self._state = STATE_UNKNOWN
+        self._written_at: Optional[float] = None
+        self._write_pending = False
+
+        additional_keys = config.get(ATTR_MONITORED)
+        self._monitored_keys = (
+            sorted(additional_keys)
+            if additional_keys is not None and additional_keys is not True
+            else None
+        )
 
     def __hash__(self):
         return hash(self.unique_id)
@@ -88,16 +104,11 @@ class HekrEntity(Entity):
 
     async def async_added_to_hass(self) -> None:
         _LOGGER.debug("Entity %s added to HASS! Setting up callbacks." % self)
-        device_entities = self._data.device_entities.setdefault(self._device_id, [])
-        device_entities.append(self)
-        self._data.refresh_connections()
+        self._data.add_entity(self._device_id, self)
 
     async def async_will_remove_from_hass(self) -> None:
         _LOGGER.debug("Entity %s removed from HomeAssistant" % self)
-        device_entities = self._data.device_entities.get(self._device_id)
-        if device_entities:
-            device_entities.remove(self)
-            self._data.refresh_connections()
+        self._data.remove_entity(self._device_id, self)
 
     @classmethod
     def create_entities(
@@ -152,21 +163,21 @@ class HekrEntity(Entity):
             for ent_type, enabled in init_enable.items()
         ]
 
-    async def handle_data_update(self, data: "CommandData") -> None:
+    @callback
+    def handle_data_update(self, data: "CommandData") -> bool:
         """
         Handle data updates for the entity.
         Updates are handled by generated updaters via HekrData class. The :func:`HekrEntity.handle_data_update` method
-        handles incoming data response
+        applies incoming data response to the entity without writing its state; writes are batched by the caller.
         :param data: Incoming data dictionary
         :type data: dict[str, Any]
+        :return: Entity state requires writing
         """
         _LOGGER.debug(
-            "Handling data update for %s entity [%s] with data: %s"
-            % (
-                self.__class__.__name__,
-                self.entity_id,
-                data,
-            )
+            "Handling data update for %s entity [%s] with data: %s",
+            self.__class__.__name__,
+            self.entity_id,
+            data,
         )
 
         state_key = self._config.get(ATTR_STATE)
@@ -192,7 +203,7 @@ class HekrEntity(Entity):
 
         elif additional_keys is not None:
             attributes = OrderedDict()
-            for attribute in sorted(additional_keys):
+            for attribute in self._monitored_keys:
                 if attribute in data:
                     attributes[attribute] = data[attribute]
                 else:
@@ -202,29 +213,116 @@ class HekrEntity(Entity):
                     )
                     attributes[attribute] = STATE_UNKNOWN
 
+        if self._attr_available:
+            if attributes == self._attributes and state == self._state:
+                self._write_pending = False
+                return False
+
+            if self._is_write_throttled(state, attributes != self._attributes):
+                _LOGGER.debug(
+                    "Holding back state write for %s entity [%s] (state: %s)",
+                    self.__class__.__name__,
+                    self.entity_id,
+                    state,
+                )
+                self._write_pending = True
+                return False
+
+        self._attr_available = True
+        self._state = state
+        self._attributes = attributes
+        self._written_at = self.hass.loop.time()
+        self._write_pending = False
+        return True
+
+    def handle_device_offline(self) -> bool:
+        """
+        Mark entity unavailable after its device has stopped responding.
+        :return: Entity state requires writing
+        """
+        self._write_pending = False
+        if not self._attr_available:
+            return False
+
+        self._attr_available = False
+        return True
+
+    def _is_write_throttled(self, state: Any, attributes_changed: bool) -> bool:
+        """
+        Check whether state write should be held back according to entity's deadband
+        and minimum write interval settings. Deadbands apply to state value only, so
+        changed attributes are written regardless. Writes held back for longer than
+        maximum age setting are never throttled; maximum age is checked as frames
+        arrive, so held back values are written with the first frame past it.
+        :param state: New state
+        :param attributes_changed: Entity attributes differ from written ones
+        :return: Write is throttled
+        """
+        since_write = self.hass.loop.time() - self._written_at
+
+        max_age = self._config.get(PROTOCOL_MAX_AGE)
+        if max_age is not None and since_write >= max_age.total_seconds():
+            return False
+
+        min_interval = self._config.get(PROTOCOL_MIN_INTERVAL)
+        if min_interval is not None and since_write < min_interval.total_seconds():
+            return True
+
+        if attributes_changed:
+            return False
+
+        deadband = self._config.get(PROTOCOL_DEADBAND)
+        deadband_relative = self._config.get(PROTOCOL_DEADBAND_RELATIVE)
+        if deadband is None and deadband_relative is None:
+            return False
+
+        current_state = self._state
+        if not (
+            isinstance(state, (int, float)) and isinstance(current_state, (int, float))
+        ):
+            return False
+
+        difference = abs(state - current_state)
+        if deadband is not None and difference > deadband:
+            return False
         if (
-            attributes != self._attributes
-            or state != self._state
-            or not self._attr_available
+            deadband_relative is not None
+            and difference > abs(current_state) * deadband_relative / 100
         ):
-            self._attr_available = True
-            self._state = state
-            self._attributes = attributes
-            await self.async_update_ha_state(force_refresh=True)
-
-    def execute_protocol_command(
-        self, protocol_command: Union[str, "CommandData"]
-    ) -> Union[bool, "MessageID"]:
+            return False
+
+        return True
+
+    @callback
+    def async_write_local_state(self, state: Any) -> None:
+        """
+        Write entity state which has not been received from device (e.g. optimistic
+        state ahead of a command's response). Next frame from device is applied to
+        the entity regardless of whether it differs from the previous one.
+        :param state: Entity state
+        """
+        self._state = state
+        self._data.forget_attributes(self._device_id, self.command_receive)
+        self.async_write_ha_state()
+
+    async def async_execute_protocol_command(
+        self,
+        protocol_command: Union[str, "CommandData"],
+        replace_key: Optional[Hashable] = None,
+    ) -> Union[bool, Optional["DeviceResponseState"]]:
         command = self._config.get(protocol_command)
         if command is not None:
             arguments = None
             if isinstance(command, tuple):
                 command, arguments = command
 
-            return asyncio.run_coroutine_threadsafe(
-                self._data.devices[self._device_id].command(command, arguments),
-                self.hass.loop,
-            ).result()
+            return await self._data.command_and_wait(
+                self._data.devices[self._device_id],
+                command,
+                arguments,
+                receive_command=self.command_receive,
+                replace_key=replace_key,
+            )
         else:
             _LOGGER.error(
                 "%s attempted to execute unknown protocol command: %s"
@@ -232,6 +330,20 @@ class HekrEntity(Entity):
             )
             return False
 
+    async def async_update(self) -> None:
+        """
+        Query device for entity data (e.g. on `homeassistant.update_entity` calls).
+        Response is applied via :func:`HekrData.callback_update_entities`.
+        """
+        await self._data.command_and_wait(
+            self._data.devices[self._device_id], self.command_update
+        )
+
+    @property
+    def write_pending(self) -> bool:
+        """Entity has received data which was not written due to throttling."""
+        return self._write_pending
+
     @property
     def should_poll(self) -> bool:
         """
@@ -242,6 +354,10 @@ class HekrEntity(Entity):
 
     @property
     def available(self) -> bool:
+        # devices added from cached listing get connectors once account is online
+        device = self._data.devices.get(self._device_id)
+        if device is not None and device.connector is None:
+            return False
         return self._attr_available
 
     @property
@@ -273,6 +389,26 @@ class HekrEntity(Entity):
     def unique_id(self) -> Optional[str]:
         raise NotImplementedError
 
+    @property
+    def watched_attributes(self) -> set[str]:
+        """
+        Data keys which affect state or attributes of the entity.
+        Contains `MONITORED_CONDITIONS_ALL` when entity monitors all received attributes.
+        """
+        watched_attributes = set()
+
+        state_key = self._config.get(ATTR_STATE)
+        if state_key:
+            watched_attributes.add(state_key)
+
+        additional_keys = self._config.get(ATTR_MONITORED)
+        if additional_keys is True:
+            watched_attributes.add(MONITORED_CONDITIONS_ALL)
+        elif additional_keys is not None:
+            watched_attributes.update(additional_keys)
+
+        return watched_attributes
+
     @property
     def command_update(self) -> str:
         return self._config.get(PROTOCOL_CMD_UPDATE)
@@ -329,11 +465,23 @@ async def _setup_entity(
         if isinstance(update_interval, int):
             update_interval = timedelta(seconds=update_interval)
 
+        configs = protocol[protocol_key]
+        customize = config.get(CONF_CUSTOMIZE)
+        if customize:
+            configs = {
+                ent_type: (
+                    {**ent_config, **customize[ent_type]}
+                    if ent_type in customize
+                    else ent_config
+                )
+                for ent_type, ent_config in configs.items()
+            }
+
         entities = entity_factory.create_entities(
             device_id=device_id,
             name=config[CONF_NAME],
             types=config.get(config_key),
-            configs=protocol[protocol_key],
+            configs=configs,
             update_interval=update_interval,
         )
 
@@ -421,6 +569,22 @@ def create_platform_basics(
         elif config_type == CONF_ACCOUNT:
             account_id = item_config[CONF_USERNAME]
 
+            # devices appearing in account listing later on are set up with it
+            hekr_data.register_account_platform(
+                account_id,
+                entity_domain,
+                partial(
+                    _setup_entity,
+                    logger=logger,
+                    hass=hass,
+                    async_add_entities=async_add_devices,
+                    config_key=config_key,
+                    protocol_key=protocol_key,
+                    entity_domain=entity_domain,
+                    entity_factory=entity_factory,
+                ),
+            )
+
             tasks = []
             for device_id, device in hekr_data.get_account_devices(account_id).items():
                 device_cfg = hekr_data.devices_config_entries[device_id]
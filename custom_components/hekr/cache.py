@@ -0,0 +1,83 @@
+"""Persistent cache of Hekr account device listings."""
+
+__all__ = (
+    "AccountDevicesCache",
+    "CachedDevice",
+)
+
+import logging
+from typing import Optional, TypedDict, TYPE_CHECKING
+
+from homeassistant.helpers.storage import Store
+
+from custom_components.hekr.const import STORAGE_KEY, STORAGE_VERSION
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from hekrapi import DeviceID
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CachedDevice(TypedDict):
+    protocol: str
+    device_info: dict
+
+
+class AccountDevicesCache:
+    """
+    Device listings of accounts as last received from the cloud, kept in Home
+    Assistant storage. Each device is stored with its cloud info (containing its
+    name, LAN address and control key) and the ID of the protocol it matched.
+    """
+
+    def __init__(self, hass: "HomeAssistant"):
+        self._store: Store[dict[str, dict["DeviceID", CachedDevice]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY, private=True
+        )
+        self._listings: Optional[dict[str, dict["DeviceID", CachedDevice]]] = None
+
+    async def async_get(
+        self, account_id: str
+    ) -> Optional[dict["DeviceID", CachedDevice]]:
+        """
+        Retrieve last stored device listing of account.
+        :param account_id: Account ID (username)
+        :return: Device ID -> cached device, `None` if account is not cached
+        """
+        if self._listings is None:
+            try:
+                self._listings = await self._store.async_load() or {}
+            except Exception:
+                _LOGGER.exception("Could not load cached account device listings")
+                self._listings = {}
+
+        return self._listings.get(account_id)
+
+    async def async_set(
+        self, account_id: str, listing: dict["DeviceID", CachedDevice]
+    ) -> None:
+        """
+        Store device listing of account.
+        :param account_id: Account ID (username)
+        :param listing: Device ID -> cached device
+        """
+        if self._listings is None:
+            await self.async_get(account_id)
+
+        if self._listings.get(account_id) == listing:
+            return
+
+        self._listings[account_id] = listing
+        await self._store.async_save(self._listings)
+
+    async def async_remove(self, account_id: str) -> None:
+        """
+        Forget device listing of account.
+        :param account_id: Account ID (username)
+        """
+        if self._listings is None:
+            await self.async_get(account_id)
+
+        if self._listings.pop(account_id, None) is not None:
+            await self._store.async_save(self._listings)
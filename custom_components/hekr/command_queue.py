@@ -0,0 +1,257 @@
+"""Per-device command queue for Hekr devices."""
+
+__all__ = (
+    "CommandPriority",
+    "CommandQueueStatistics",
+    "DeviceCommandQueue",
+    "get_command_key",
+)
+
+import asyncio
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable, Optional, TYPE_CHECKING
+
+from hekrapi import HekrAPIException
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from hekrapi import DeviceID
+
+_LOGGER = logging.getLogger(__name__)
+
+CommandKey = tuple[str, tuple]
+
+
+def get_command_key(command: str, arguments: Optional[dict] = None) -> CommandKey:
+    """
+    Build hashable key identifying command with its arguments.
+    :param command: Command name
+    :param arguments: (optional) Command arguments
+    :return: Command key
+    """
+    return command, tuple(sorted(arguments.items())) if arguments else ()
+
+
+def _copy_future_state(target: asyncio.Future, source: asyncio.Future) -> None:
+    if target.done():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+class CommandPriority(IntEnum):
+    USER = 0
+    POLL = 1
+
+
+@dataclass
+class _QueuedCommand:
+    action: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float
+    priority: int
+    flight_key: Optional[Hashable] = None
+    replace_key: Optional[Hashable] = None
+    sent: bool = False
+    superseded: bool = False
+
+
+@dataclass
+class CommandQueueStatistics:
+    depth: int
+    sent: int
+    dropped: int
+    last_wait: float
+    max_wait: float
+    average_wait: float
+    running: bool = False
+
+
+class DeviceCommandQueue:
+    """
+    Queue sending commands to a single device one at a time.
+
+    User-initiated commands are sent ahead of background polls. Commands carrying a
+    flight key (identical queries) are single-flight: a command queued while another one
+    with the same key is pending or awaiting response is dropped, and its caller shares
+    the outgoing frame and the response of the former. Commands carrying a replace key
+    (e.g. switch toggles) are last-write-wins: a command still queued when another one
+    with the same key arrives is dropped, and its caller receives the result of the
+    latter. The queue is drained by a task which only exists while there are commands
+    to send.
+    """
+
+    def __init__(self, hass: "HomeAssistant", device_id: "DeviceID"):
+        self.hass = hass
+        self.device_id = device_id
+
+        self._heap: list[tuple[int, int, _QueuedCommand]] = []
+        self._sequence = itertools.count()
+        self._flights: dict[Hashable, _QueuedCommand] = {}
+        self._replaceable: dict[Hashable, _QueuedCommand] = {}
+        self._worker: Optional[asyncio.Task] = None
+
+        self._sent = 0
+        self._dropped = 0
+        self._last_wait = 0.0
+        self._max_wait = 0.0
+        self._total_wait = 0.0
+
+    def __len__(self):
+        return len(
+            {
+                id(entry)
+                for _, _, entry in self._heap
+                if not (entry.sent or entry.superseded)
+            }
+        )
+
+    async def execute(
+        self,
+        action: Callable[[], Awaitable[Any]],
+        priority: CommandPriority = CommandPriority.USER,
+        flight_key: Optional[Hashable] = None,
+        replace_key: Optional[Hashable] = None,
+    ) -> Any:
+        """
+        Queue command and wait for its result.
+        :param action: Coroutine function sending the command
+        :param priority: Command priority
+        :param flight_key: (optional) Key identifying command for single-flight
+        :param replace_key: (optional) Key identifying commands superseding each other
+        :return: Result of the action
+        """
+        if flight_key is not None:
+            flight = self._flights.get(flight_key)
+            if flight is not None and not flight.future.done():
+                _LOGGER.debug(
+                    'Dropping command %s for device "%s", identical command is %s'
+                    % (flight_key, self.device_id, "sent" if flight.sent else "queued")
+                )
+                self._dropped += 1
+                if not flight.sent and priority < flight.priority:
+                    # promote queued command, its previous heap item is skipped
+                    flight.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._sequence), flight))
+                return await asyncio.shield(flight.future)
+
+        entry = _QueuedCommand(
+            action=action,
+            future=self.hass.loop.create_future(),
+            enqueued_at=self.hass.loop.time(),
+            priority=priority,
+            flight_key=flight_key,
+            replace_key=replace_key,
+        )
+        if flight_key is not None:
+            self._flights[flight_key] = entry
+
+        if replace_key is not None:
+            superseded = self._replaceable.get(replace_key)
+            if superseded is not None and not superseded.sent:
+                _LOGGER.debug(
+                    'Dropping command %s for device "%s", superseded before sending'
+                    % (replace_key, self.device_id)
+                )
+                self._dropped += 1
+                superseded.superseded = True
+                entry.future.add_done_callback(
+                    partial(_copy_future_state, superseded.future)
+                )
+            self._replaceable[replace_key] = entry
+
+        heapq.heappush(self._heap, (priority, next(self._sequence), entry))
+
+        if self._worker is None or self._worker.done():
+            self._worker = self.hass.async_create_background_task(
+                self._drain(), name="hekr_commands_" + self.device_id
+            )
+
+        if flight_key is not None:
+            # cancellation of one caller must not affect the others
+            return await asyncio.shield(entry.future)
+        return await entry.future
+
+    def stop(self) -> None:
+        """Cancel sending of all queued commands."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+        self._worker = None
+
+        for _, _, entry in self._heap:
+            if not entry.future.done():
+                entry.future.cancel()
+        for entry in self._flights.values():
+            if not entry.future.done():
+                entry.future.cancel()
+        self._heap.clear()
+        self._flights.clear()
+        self._replaceable.clear()
+
+    def get_statistics(self) -> CommandQueueStatistics:
+        """
+        Retrieve queue statistics.
+        :return: Statistics object
+        """
+        return CommandQueueStatistics(
+            depth=len(self),
+            sent=self._sent,
+            dropped=self._dropped,
+            last_wait=self._last_wait,
+            max_wait=self._max_wait,
+            average_wait=self._total_wait / self._sent if self._sent else 0.0,
+            running=self._worker is not None and not self._worker.done(),
+        )
+
+    async def _drain(self) -> None:
+        while self._heap:
+            _, _, entry = heapq.heappop(self._heap)
+            if entry.sent or entry.superseded:
+                # stale heap item of a promoted or a superseded command
+                continue
+            entry.sent = True
+            if entry.replace_key is not None:
+                if self._replaceable.get(entry.replace_key) is entry:
+                    del self._replaceable[entry.replace_key]
+
+            if entry.future.done():
+                # caller has been cancelled
+                self._discard_flight(entry)
+                continue
+
+            wait = self.hass.loop.time() - entry.enqueued_at
+            self._sent += 1
+            self._last_wait = wait
+            self._total_wait += wait
+            if wait > self._max_wait:
+                self._max_wait = wait
+
+            try:
+                result = await entry.action()
+            except asyncio.CancelledError:
+                if not entry.future.done():
+                    entry.future.cancel()
+                raise
+            except (Exception, HekrAPIException) as e:
+                # hekrapi exceptions derive from `BaseException`
+                if not entry.future.done():
+                    entry.future.set_exception(e)
+            else:
+                if not entry.future.done():
+                    entry.future.set_result(result)
+            finally:
+                self._discard_flight(entry)
+
+    def _discard_flight(self, entry: _QueuedCommand) -> None:
+        if entry.flight_key is not None:
+            if self._flights.get(entry.flight_key) is entry:
+                del self._flights[entry.flight_key]
@@ -37,9 +37,13 @@ from .const import (
     DEFAULT_SCAN_INTERVAL,
     PROTOCOL_DEFAULT,
     CONF_DUMP_DEVICE_CREDENTIALS,
-    PROTOCOL_DEFINITION,
+    DEFAULT_PROBE_BUDGET,
+    DEFAULT_STARTUP_CONCURRENCY,
+    PROTOCOL_AUTO,
 )
+from .detection import ProbeTarget, ProtocolProber
 from .supported_protocols import SUPPORTED_PROTOCOLS
+from .transport import UDPEndpointPool
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,8 +57,11 @@ DEVICE_SCHEMA = vol.Schema(
         vol.Required(CONF_HOST): cv.string,
         vol.Required(CONF_PROTOCOL): vol.In(
             {
-                p_id: p_def.get(PROTOCOL_NAME, p_id)
-                for p_id, p_def in SUPPORTED_PROTOCOLS.items()
+                PROTOCOL_AUTO: "Auto-detect",
+                **{
+                    p_id: p_def.get(PROTOCOL_NAME, p_id)
+                    for p_id, p_def in SUPPORTED_PROTOCOLS.items()
+                },
             }
         ),
         vol.Optional(CONF_PORT): cv.string,
@@ -87,6 +94,8 @@ class HekrFlowHandler(ConfigFlow, domain=DOMAIN):
         self._current_config = None
         self._devices_info = None
 
+        self.schema_user = USER_SCHEMA
+        self.schema_device = DEVICE_SCHEMA
         self.schema_additional = lambda protocol_id, protocol_key: vol.Schema(
             {
                 vol.Optional(
@@ -280,8 +289,28 @@ class HekrFlowHandler(ConfigFlow, domain=DOMAIN):
             )
             return self.async_abort(reason="device_already_exists")
 
-        # Check whether specified protocol is under the supported list
+        # Detect protocol by probing the device, if requested
         protocol_id = user_input[CONF_PROTOCOL]
+        if protocol_id == PROTOCOL_AUTO:
+            protocol_id = await self._detect_protocol(user_input)
+            if protocol_id is None:
+                _LOGGER.warning(
+                    'Could not detect protocol during config for device "%s".'
+                    % device_id
+                )
+                return self.async_show_form(
+                    step_id="device",
+                    data_schema=self.schema_device,
+                    errors={CONF_PROTOCOL: "protocol_not_detected"},
+                )
+
+            _LOGGER.info(
+                'Detected protocol "%s" during config for device "%s".'
+                % (protocol_id, device_id)
+            )
+            user_input[CONF_PROTOCOL] = protocol_id
+
+        # Check whether specified protocol is under the supported list
         if protocol_id not in SUPPORTED_PROTOCOLS:
             _LOGGER.warning(
                 'Unsupported protocol "%s" provided during config for device "%s".'
@@ -322,6 +351,33 @@ class HekrFlowHandler(ConfigFlow, domain=DOMAIN):
 
         return await self._get_next_additional_step()
 
+    async def _detect_protocol(self, user_input: dict[str, Any]) -> str | None:
+        """
+        Detect protocol of device by probing it over LAN.
+        :param user_input: User input from Home Assistant form
+        :return: Protocol ID, `None` if no protocol has been detected
+        """
+        target = ProbeTarget(
+            user_input[CONF_DEVICE_ID],
+            user_input[CONF_CONTROL_KEY],
+            user_input[CONF_HOST],
+        )
+
+        hekr_data = self.hass.data.get(DOMAIN)
+        if hekr_data is not None:
+            return await hekr_data.protocol_prober.async_detect(
+                target, DEFAULT_PROBE_BUDGET
+            )
+
+        # component is not set up yet, probe through a temporary endpoint pool
+        endpoint_pool = UDPEndpointPool()
+        try:
+            return await ProtocolProber(
+                SUPPORTED_PROTOCOLS, endpoint_pool, DEFAULT_STARTUP_CONCURRENCY
+            ).async_detect(target, DEFAULT_PROBE_BUDGET)
+        finally:
+            endpoint_pool.close()
+
     async def async_step_account(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -375,24 +431,14 @@ class HekrFlowHandler(ConfigFlow, domain=DOMAIN):
             _LOGGER.debug("Selected account credentials dump")
             del user_input[CONF_DUMP_DEVICE_CREDENTIALS]
 
-            # Get all supported protocols
-            supported_protocols = {
-                protocol_id: protocol[PROTOCOL_DEFINITION]
-                for protocol_id, protocol in SUPPORTED_PROTOCOLS.items()
+            # Update devices from account, and match them with supported protocols
+            await account.update_devices(devices_info)
+            device_protocols = {
+                device_id: SUPPORTED_PROTOCOLS.match_device(d)
+                for device_id, d in account.devices.items()
             }
 
-            # Create list for matching
-            supported_protocols_vals = list(supported_protocols.values())
-
-            # Update devices from account (match them with supported protocols)
-            await account.update_devices(
-                devices_info, protocols=supported_protocols_vals
-            )
-
             if account.devices:
-                # Create list for looking up protocol ID's
-                supported_protocols_keys = list(supported_protocols.keys())
-
                 # Generate placeholder for every device
                 placeholder_text = "hekr:\n  devices:\n" + "\n\n".join(
                     [
@@ -400,10 +446,10 @@ class HekrFlowHandler(ConfigFlow, domain=DOMAIN):
                         f"    {CONF_NAME}: {d.device_name}\n"
                         f"    {CONF_CONTROL_KEY}: {d.control_key}\n"
                         f"    {CONF_HOST}: {d.lan_address}\n"
-                        f"    {CONF_PROTOCOL}: {supported_protocols_keys[supported_protocols_vals.index(d.protocol)]}\n"
+                        f"    {CONF_PROTOCOL}: {device_protocols[device_id]}\n"
                         f"    # device is {'online' if d.is_online else 'offline'}\n"
                         for device_id, d in account.devices.items()
-                        if d.protocol in supported_protocols_vals
+                        if device_protocols[device_id] is not None
                     ]
                 )
 
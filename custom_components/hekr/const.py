@@ -13,6 +13,8 @@ from homeassistant.const import (
 )
 
 DOMAIN = "hekr"
+STORAGE_KEY = DOMAIN + "_account_devices"
+STORAGE_VERSION = 1
 
 DEFAULT_SCAN_INTERVAL = timedelta(seconds=15)
 DEFAULT_NAME_DEVICE = "Hekr {protocol_name} {device_id}"
@@ -23,8 +25,26 @@ DEFAULT_APPLICATION_ID = "hass_hekr_python"
 DEFAULT_CLOUD_HOST = "fra-hub.hekreu.me"
 DEFAULT_CLOUD_PORT = 186
 DEFAULT_USE_MODEL_FROM_PROTOCOL = True
-DEFAULT_SLEEP_INTERVAL = 4
 DEFAULT_TIMEOUT = 10.0
+DEFAULT_POLL_CONCURRENCY = 8
+DEFAULT_POLL_JITTER = 0.1
+DEFAULT_POLL_LATENESS_WARNING = 5.0
+DEFAULT_PUSH_AWARE_POLLING = True
+DEFAULT_REFRESH_DELAY = 0.1
+DEFAULT_MIN_COMMAND_TIMEOUT = 0.2
+DEFAULT_COMMAND_RETRIES = 2
+DEFAULT_OFFLINE_THRESHOLD = 2
+DEFAULT_OFFLINE_BACKOFF_MIN = 5.0
+DEFAULT_OFFLINE_BACKOFF_MAX = 600.0
+DEFAULT_STARTUP_CONCURRENCY = 8
+DEFAULT_SHUTDOWN_TIMEOUT = 5.0
+DEFAULT_ACCOUNT_RETRY_INTERVAL = 60
+DEFAULT_ACCOUNT_SYNC_INTERVAL = timedelta(hours=1)
+DEFAULT_TOKEN_REFRESH_LEAD = 60.0
+DEFAULT_TOKEN_REFRESH_SPREAD = 600.0
+DEFAULT_TOKEN_RETRY_MIN = 10.0
+DEFAULT_TOKEN_RETRY_MAX = 900.0
+DEFAULT_PROBE_BUDGET = 5.0
 
 CONF_DEVICE_ID = CONF_DEVICE_ID
 CONF_CONTROL_KEY = "control_key"
@@ -38,9 +58,16 @@ CONF_DEVICES = "devices"
 CONF_USE_MODEL_FROM_PROTOCOL = "use_model_from_protocol"
 CONF_DUMP_DEVICE_CREDENTIALS = "dump_device_credentials"
 CONF_TOKEN_UPDATE_INTERVAL = "token_update_interval"
+CONF_SYNC_INTERVAL = "sync_interval"
+CONF_DETECT_PROTOCOLS = "detect_protocols"
+CONF_PUSH_AWARE_POLLING = "push_aware_polling"
+CONF_STARTUP_CONCURRENCY = "startup_concurrency"
 
 PROTOCOL_NAME = "name"
 PROTOCOL_MODEL = "model"
+PROTOCOL_PRODUCT_NAMES = "product_names"
+PROTOCOL_PROBE_COMMAND = "probe_command"
+PROTOCOL_AUTO = "auto"
 PROTOCOL_MANUFACTURER = "manufacturer"
 PROTOCOL_PORT = "port"
 PROTOCOL_DETECTION = "detection"
@@ -54,6 +81,10 @@ PROTOCOL_CMD_TURN_ON = "turn_on_command"
 PROTOCOL_CMD_TURN_OFF = "turn_off_command"
 PROTOCOL_SWITCHES = "switches"
 PROTOCOL_STATUS = "status"
+PROTOCOL_DEADBAND = "deadband"
+PROTOCOL_DEADBAND_RELATIVE = "deadband_relative"
+PROTOCOL_MIN_INTERVAL = "min_interval"
+PROTOCOL_MAX_AGE = "max_age"
 
 ATTR_STATE_ATTRIBUTE = "state_attribute"
 ATTR_MONITORED = "monitored_attributes"
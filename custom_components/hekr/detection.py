@@ -0,0 +1,196 @@
+"""Protocol auto-detection for Hekr devices reachable over LAN."""
+
+__all__ = (
+    "ProbeTarget",
+    "ProtocolProber",
+)
+
+import asyncio
+import logging
+from json import loads
+from typing import Iterable, NamedTuple, Optional
+
+from hekrapi import (
+    ACTION_COMMAND_RESPONSE,
+    DEFAULT_APPLICATION_ID,
+    Device,
+    DeviceID,
+    HekrAPIException,
+)
+
+from custom_components.hekr.const import (
+    PROTOCOL_DEFINITION,
+    PROTOCOL_PORT,
+    PROTOCOL_PROBE_COMMAND,
+)
+from custom_components.hekr.protocol_registry import ProtocolRegistry
+from custom_components.hekr.transport import SharedLocalConnector, UDPEndpointPool
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ProbeTarget(NamedTuple):
+    device_id: DeviceID
+    control_key: str
+    host: str
+
+
+class ProtocolProber:
+    """
+    Detector of device protocols by probing devices over LAN.
+
+    Query commands of every candidate protocol are sent to a device at once, and the
+    first response which decodes cleanly under the protocol its query was encoded
+    with selects the protocol. Devices are probed concurrently within a shared time
+    budget. Detected protocols are remembered, so devices are probed only until
+    their protocol is found.
+    """
+
+    def __init__(
+        self,
+        protocols: ProtocolRegistry,
+        endpoint_pool: UDPEndpointPool,
+        concurrency: int,
+        application_id: str = DEFAULT_APPLICATION_ID,
+    ):
+        self.protocols = protocols
+        self.endpoint_pool = endpoint_pool
+        self.concurrency = concurrency
+        self.application_id = application_id
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._results: dict[DeviceID, str] = {}
+
+    def forget(self, device_id: DeviceID) -> None:
+        """
+        Forget protocol detected for device earlier, so that it is probed again
+        (e.g. after it has been reconfigured).
+        :param device_id: Device ID
+        """
+        self._results.pop(device_id, None)
+
+    async def async_detect(self, target: ProbeTarget, budget: float) -> Optional[str]:
+        """
+        Detect protocol of a single device.
+        :param target: Device to probe
+        :param budget: Time budget (in seconds)
+        :return: Protocol ID, `None` if no protocol has been detected
+        """
+        results = await self.async_detect_many((target,), budget)
+        return results[target.device_id]
+
+    async def async_detect_many(
+        self, targets: Iterable[ProbeTarget], budget: float
+    ) -> dict[DeviceID, Optional[str]]:
+        """
+        Detect protocols of devices concurrently.
+        :param targets: Devices to probe
+        :param budget: Time budget (in seconds) shared by all devices
+        :return: Device ID -> protocol ID (`None` if no protocol has been detected)
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        deadline = asyncio.get_running_loop().time() + budget
+        targets = {target.device_id: target for target in targets}
+        results = await asyncio.gather(
+            *(self._detect(target, deadline) for target in targets.values())
+        )
+        return dict(zip(targets, results))
+
+    async def _detect(self, target: ProbeTarget, deadline: float) -> Optional[str]:
+        protocol_id = self._results.get(target.device_id)
+        if protocol_id is not None:
+            return protocol_id
+
+        # candidates are grouped by port, to probe every port with a single connection
+        ports: dict[int, list[str]] = {}
+        for protocol_id, protocol in self.protocols.items():
+            if protocol.get(PROTOCOL_PROBE_COMMAND) and protocol.get(PROTOCOL_PORT):
+                ports.setdefault(protocol[PROTOCOL_PORT], []).append(protocol_id)
+
+        protocol_id = None
+        try:
+            async with asyncio.timeout_at(deadline):
+                async with self._semaphore:
+                    for port, protocol_ids in ports.items():
+                        protocol_id = await self._probe(target, port, protocol_ids)
+                        if protocol_id is not None:
+                            break
+
+        except TimeoutError:
+            _LOGGER.debug("Probing device %s timed out" % target.device_id)
+            return None
+
+        except (HekrAPIException, OSError) as e:
+            _LOGGER.debug("Could not probe device %s: %s" % (target.device_id, e))
+            return None
+
+        if protocol_id is None:
+            _LOGGER.debug("No protocol matched device %s" % target.device_id)
+        else:
+            _LOGGER.debug(
+                "Detected protocol %s on device %s" % (protocol_id, target.device_id)
+            )
+            self._results[target.device_id] = protocol_id
+
+        return protocol_id
+
+    async def _probe(
+        self, target: ProbeTarget, port: int, protocol_ids: list[str]
+    ) -> Optional[str]:
+        device = Device(device_id=target.device_id, control_key=target.control_key)
+        connector = SharedLocalConnector(
+            target.host,
+            port,
+            self.endpoint_pool,
+            application_id=self.application_id,
+        )
+        device.connector = connector
+
+        try:
+            await connector.open_connection()
+
+            probes = {}
+            for protocol_id in protocol_ids:
+                protocol = self.protocols[protocol_id]
+                device.protocol = protocol[PROTOCOL_DEFINITION]
+                command = device.protocol.get_command(protocol[PROTOCOL_PROBE_COMMAND])
+                message_id = await device.command(command)
+                probes[message_id] = (protocol_id, command)
+
+            while probes:
+                try:
+                    response = loads(await connector.read_response())
+                    message_id = response.get("msgId")
+                except (ValueError, AttributeError):
+                    continue
+
+                if message_id not in probes:
+                    continue
+
+                protocol_id, command = probes.pop(message_id)
+                if response.get("action") != ACTION_COMMAND_RESPONSE:
+                    continue
+                if response.get("code", 200) != 200:
+                    continue
+
+                definition = self.protocols[protocol_id][PROTOCOL_DEFINITION]
+                try:
+                    response_command, _, _ = definition.decode(
+                        response["params"]["data"]
+                    )
+                except (HekrAPIException, LookupError, TypeError, ValueError):
+                    continue
+
+                if command.response_command_id in (
+                    None,
+                    response_command.command_id,
+                ):
+                    return protocol_id
+
+            return None
+
+        finally:
+            await connector.close_connection()
+            device.connector = None
@@ -0,0 +1,38 @@
+"""Diagnostics support for Hekr."""
+
+__all__ = ["async_get_config_entry_diagnostics"]
+
+from dataclasses import asdict
+from typing import Any, TYPE_CHECKING
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .hekr_data import HekrData
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    hekr_data: "HekrData" = hass.data[DOMAIN]
+
+    poll_statistics = hekr_data.poll_scheduler.get_statistics()
+    devices = {}
+    for device_id in hekr_data.collect_devices_for_entry(entry):
+        command_queue = hekr_data.command_queues.get(device_id)
+        device_statistics = poll_statistics.get(device_id)
+        devices[device_id] = {
+            "polling": device_statistics and asdict(device_statistics),
+            "command_queue": command_queue and asdict(command_queue.get_statistics()),
+        }
+
+    return {
+        "devices": devices,
+        "startup": {
+            stage: {**asdict(timing), "wall": timing.wall}
+            for stage, timing in hekr_data.startup.get_statistics().items()
+        },
+    }
@@ -0,0 +1,86 @@
+"""Device health tracking for Hekr devices."""
+
+__all__ = (
+    "DeviceHealth",
+    "DeviceHealthState",
+)
+
+import random
+from enum import Enum
+
+MAX_BACKOFF_EXPONENT = 16
+
+
+class DeviceHealthState(Enum):
+    HEALTHY = "healthy"
+    DEGRADED = "degraded"
+    OFFLINE = "offline"
+
+
+class DeviceHealth:
+    """
+    Circuit breaker tracking reachability of a single device.
+
+    A device missing a response becomes degraded, and goes offline once it misses a
+    given number of responses in a row. Any frame received from the device makes it
+    healthy again. Retry delays grow exponentially with consecutive failures, with
+    half of every delay randomized so that devices lost together (e.g. on a network
+    outage) are not retried in lockstep.
+    """
+
+    def __init__(self, offline_threshold: int, backoff_min: float, backoff_max: float):
+        self.offline_threshold = offline_threshold
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.state = DeviceHealthState.HEALTHY
+        self.failures = 0
+        self.changed_at: float = 0.0
+
+    def __str__(self):
+        return "<Hekr:DeviceHealth(%s, %d failures)>" % (
+            self.state.value,
+            self.failures,
+        )
+
+    @property
+    def is_offline(self) -> bool:
+        return self.state == DeviceHealthState.OFFLINE
+
+    def record_success(self, loop_time: float) -> DeviceHealthState:
+        """
+        Reset breaker after a frame has been received from device.
+        :param loop_time: Current loop time
+        :return: Previous state
+        """
+        previous_state = self.state
+        self.failures = 0
+        if previous_state != DeviceHealthState.HEALTHY:
+            self.state = DeviceHealthState.HEALTHY
+            self.changed_at = loop_time
+        return previous_state
+
+    def record_failure(self, loop_time: float) -> DeviceHealthState:
+        """
+        Account for a response device has not delivered.
+        :param loop_time: Current loop time
+        :return: New state
+        """
+        self.failures += 1
+        if self.failures >= self.offline_threshold:
+            state = DeviceHealthState.OFFLINE
+        else:
+            state = DeviceHealthState.DEGRADED
+
+        if state != self.state:
+            self.state = state
+            self.changed_at = loop_time
+        return state
+
+    def get_retry_delay(self) -> float:
+        """
+        Derive delay before device is contacted again.
+        :return: Delay (in seconds)
+        """
+        exponent = min(max(self.failures - 1, 0), MAX_BACKOFF_EXPONENT)
+        delay = min(self.backoff_min * 2**exponent, self.backoff_max)
+        return delay / 2 + random.uniform(0.0, delay / 2)
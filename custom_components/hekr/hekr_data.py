@@ -1,20 +1,33 @@
 import asyncio
 import logging
+import socket
 from datetime import timedelta
 from functools import partial
+from itertools import chain
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Coroutine,
+    Union,
+    Callable,
+    Optional,
+    Hashable,
+    Iterable,
+)
 
-from typing import TYPE_CHECKING, Union, Callable, Optional
-
+from aiohttp import ClientError
 from hekrapi import (
     Device,
     DeviceID,
+    MessageID,
     DeviceResponseState,
     ACTION_COMMAND_RESPONSE,
     ACTION_DEVICE_MESSAGE,
-    LocalConnector,
     HekrAPIException,
 )
-from hekrapi.account import Account
+from hekrapi.exceptions import ConnectionTimeoutException
 from homeassistant import config_entries
 from homeassistant.const import (
     EVENT_HOMEASSISTANT_START,
@@ -27,18 +40,39 @@ from homeassistant.const import (
     CONF_NAME,
     CONF_USERNAME,
     CONF_PASSWORD,
-    CONF_CUSTOMIZE,
     CONF_TIMEOUT,
 )
+from homeassistant.helpers import device_registry as dr, entity_registry as er
 from homeassistant.helpers.event import (
+    async_call_later,
     async_track_time_interval,
-    async_track_point_in_time,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.util.dt import now
 
+from custom_components.hekr.cache import AccountDevicesCache
+from custom_components.hekr.detection import ProbeTarget, ProtocolProber
+from custom_components.hekr.command_queue import (
+    CommandPriority,
+    DeviceCommandQueue,
+    get_command_key,
+)
+from custom_components.hekr.health import DeviceHealth, DeviceHealthState
+from custom_components.hekr.listener import FrameLatency, NativeListener
+from custom_components.hekr.rtt import RTTEstimator
+from custom_components.hekr.scheduler import PollScheduler
+from custom_components.hekr.startup import (
+    STAGE_AUTHENTICATE,
+    STAGE_CONNECT,
+    STAGE_CONNECT_CLOUD,
+    STAGE_DETECT_PROTOCOL,
+    STAGE_LIST_DEVICES,
+    StartupOrchestrator,
+)
 from custom_components.hekr.supported_protocols import SUPPORTED_PROTOCOLS
+from custom_components.hekr.tokens import HekrAccount, TokenRefreshManager
+from custom_components.hekr.transport import SharedLocalConnector, UDPEndpointPool
 from custom_components.hekr.const import (
     DOMAIN,
     DEFAULT_USE_MODEL_FROM_PROTOCOL,
@@ -50,15 +84,37 @@ from custom_components.hekr.const import (
     PROTOCOL_DEFINITION,
     PROTOCOL_PORT,
     CONF_ACCOUNT,
-    DEFAULT_SLEEP_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
     PROTOCOL_MODEL,
     PROTOCOL_MANUFACTURER,
     PROTOCOL_NAME,
     CONF_DEVICE,
     CONF_TOKEN_UPDATE_INTERVAL,
+    CONF_SYNC_INTERVAL,
+    CONF_DETECT_PROTOCOLS,
     DEFAULT_NAME_DEVICE,
     DEFAULT_TIMEOUT,
+    DEFAULT_POLL_CONCURRENCY,
+    DEFAULT_POLL_JITTER,
+    DEFAULT_POLL_LATENESS_WARNING,
+    CONF_PUSH_AWARE_POLLING,
+    DEFAULT_PUSH_AWARE_POLLING,
+    DEFAULT_REFRESH_DELAY,
+    DEFAULT_MIN_COMMAND_TIMEOUT,
+    DEFAULT_COMMAND_RETRIES,
+    DEFAULT_OFFLINE_THRESHOLD,
+    DEFAULT_OFFLINE_BACKOFF_MIN,
+    DEFAULT_OFFLINE_BACKOFF_MAX,
+    DEFAULT_STARTUP_CONCURRENCY,
+    DEFAULT_SHUTDOWN_TIMEOUT,
+    DEFAULT_ACCOUNT_RETRY_INTERVAL,
+    DEFAULT_ACCOUNT_SYNC_INTERVAL,
+    DEFAULT_TOKEN_REFRESH_LEAD,
+    DEFAULT_TOKEN_REFRESH_SPREAD,
+    DEFAULT_TOKEN_RETRY_MIN,
+    DEFAULT_TOKEN_RETRY_MAX,
+    DEFAULT_PROBE_BUDGET,
+    MONITORED_CONDITIONS_ALL,
 )
 
 if TYPE_CHECKING:
@@ -89,13 +145,61 @@ class HekrData:
         self.devices: dict[DeviceID, Device] = {}
         self.devices_config_yaml: dict[DeviceID, ConfigType] = {}
         self.devices_config_entries: dict[DeviceID, ConfigType] = {}
+        self.devices_customize: dict[DeviceID, Union[ConfigType, bool]] = {}
         self.device_entities: dict[DeviceID, list["HekrEntity"]] = {}
+        self.account_devices: dict[Username, dict[DeviceID, Device]] = {}
+        self.host_devices: dict[str, set[DeviceID]] = {}
+        self.command_entities: dict[tuple[DeviceID, str], list["HekrEntity"]] = {}
+        self.attribute_entities: dict[
+            tuple[DeviceID, str], dict[str, list["HekrEntity"]]
+        ] = {}
+        self.last_attributes: dict[tuple[DeviceID, str], dict] = {}
+        self.throttled_entities: dict[tuple[DeviceID, str], set["HekrEntity"]] = {}
         self.device_updaters: dict[DeviceID, tuple[set[str], Callable]] = {}
+        self.push_timestamps: dict[tuple[DeviceID, str], float] = {}
+        self.response_waiters: dict[
+            tuple[DeviceID, MessageID], asyncio.Future[DeviceResponseState]
+        ] = {}
+        self.write_responses: dict[tuple[DeviceID, MessageID], str] = {}
+        self.command_queues: dict[DeviceID, DeviceCommandQueue] = {}
+        self.rtt_estimators: dict[DeviceID, RTTEstimator] = {}
+        self.device_health: dict[DeviceID, DeviceHealth] = {}
+        self.poll_scheduler = PollScheduler(
+            hass,
+            concurrency=DEFAULT_POLL_CONCURRENCY,
+            jitter=DEFAULT_POLL_JITTER,
+            lateness_warning=DEFAULT_POLL_LATENESS_WARNING,
+        )
+        self.udp_endpoints = UDPEndpointPool()
+        self.protocol_prober = ProtocolProber(
+            SUPPORTED_PROTOCOLS,
+            self.udp_endpoints,
+            concurrency=DEFAULT_STARTUP_CONCURRENCY,
+        )
+        self.startup = StartupOrchestrator(
+            hass, concurrency=DEFAULT_STARTUP_CONCURRENCY
+        )
+        self.frame_latency = FrameLatency()
+        self.pending_refreshes: set[DeviceID] = set()
+        self._refresh_handle: Optional[asyncio.TimerHandle] = None
 
-        self.accounts: dict[Username, Account] = {}
+        self.accounts: dict[Username, HekrAccount] = {}
         self.accounts_config_yaml: dict[Username, ConfigType] = {}
         self.accounts_config_entries: dict[Username, ConfigType] = {}
-        self.account_updaters: dict[Username, Callable] = {}
+        self.account_retries: dict[Username, Callable] = {}
+        self.account_syncs: dict[Username, Callable] = {}
+        self.account_sync_tasks: dict[Username, asyncio.Task] = {}
+        self.account_platforms: dict[
+            Username, dict[str, Callable[..., Awaitable[bool]]]
+        ] = {}
+        self.account_cache = AccountDevicesCache(hass)
+        self.token_manager = TokenRefreshManager(
+            hass,
+            refresh_lead=DEFAULT_TOKEN_REFRESH_LEAD,
+            refresh_spread=DEFAULT_TOKEN_REFRESH_SPREAD,
+            backoff_min=DEFAULT_TOKEN_RETRY_MIN,
+            backoff_max=DEFAULT_TOKEN_RETRY_MAX,
+        )
 
         self.use_model_from_protocol = DEFAULT_USE_MODEL_FROM_PROTOCOL
 
@@ -122,34 +226,66 @@ class HekrData:
         :return:
         """
         _LOGGER.debug("Hekr system is shutting down")
-        for device_id, device in self.devices.items():
-            connector = device.connector
-            listener = connector.listener
-            if listener is not None and listener.is_running:
-                _LOGGER.debug('Shutting down listener for device ID "%s"' % device_id)
-                listener.stop()
-
-            if connector.is_connected:
-                _LOGGER.debug('Shutting down connector for device ID "%s"' % device_id)
-                await connector.close_connection()
+        if self.frame_latency.count:
+            _LOGGER.debug(
+                "Frame arrival to state write latency over %d frames: "
+                "%.3f ms average, %.3f ms maximum"
+                % (
+                    self.frame_latency.count,
+                    self.frame_latency.average * 1000,
+                    self.frame_latency.maximum * 1000,
+                )
+            )
+        self.startup.cancel()
+        self.token_manager.stop()
+        self.poll_scheduler.stop()
+        for command_queue in self.command_queues.values():
+            command_queue.stop()
+        if self._refresh_handle is not None:
+            self._refresh_handle.cancel()
+            self._refresh_handle = None
+
+        await self.close_connectors(
+            {
+                device.connector
+                for device in self.devices.values()
+                if device.connector is not None
+            }
+        )
+        self.udp_endpoints.close()
 
-    async def callback_update_entities(
+    @callback
+    def callback_update_entities(
         self,
         device: Device,
         message_id: int,
         state: DeviceResponseState,
         action: str,
         data: tuple["Command", dict, int],
+        received_at: Optional[float] = None,
     ) -> None:
         """
-        Callback for Hekr messages on receive. Schedules entities for update once after a message was received.
+        Callback for Hekr messages on receive. Applies received data to subscribed entities, and writes states
+        of the changed ones in a single pass.
         :param device: Device message comes from
         :param message_id: Message ID
         :param state: Response state
         :param action: Message type (action)
         :param data: Tuple of executed command, data and frame number
+        :param received_at: (optional) Loop time of message arrival, for latency tracking
         :return:
         """
+        if device:
+            self._record_device_frame(device.device_id)
+
+        write_receive_command = None
+        if device and action == ACTION_COMMAND_RESPONSE:
+            waiter_key = (device.device_id, message_id)
+            waiter = self.response_waiters.pop(waiter_key, None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(state)
+            write_receive_command = self.write_responses.pop(waiter_key, None)
+
         if (
             device
             and action in (ACTION_COMMAND_RESPONSE, ACTION_DEVICE_MESSAGE)
@@ -157,16 +293,34 @@ class HekrData:
         ):
 
             _LOGGER.debug(
-                "Received response (message ID: %d) from information command (action: %s) with data: %s"
-                % (message_id, action, data)
+                "Received response (message ID: %d) from information command (action: %s) with data: %s",
+                message_id,
+                action,
+                data,
             )
             command, data, frame_number = data
 
-            update_entities = self.device_entities.get(device.device_id)
+            command_key = (device.device_id, command.name)
+            subscribed_entities = self.command_entities.get(command_key)
+            echoed_attributes = None
+
+            if write_receive_command is not None:
+                if not subscribed_entities:
+                    # response echoes the write command, apply it over the last report
+                    command_key = (device.device_id, write_receive_command)
+                    subscribed_entities = self.command_entities.get(command_key)
+                    echoed_attributes = data.keys()
+
+                self.push_timestamps[command_key] = self.hass.loop.time()
+                self.reset_poll_timer(device.device_id)
 
-            if not update_entities:
-                _LOGGER.info(
-                    "Device %s does not have any associated entities" % device.device_id
+            elif action == ACTION_DEVICE_MESSAGE:
+                self.push_timestamps[command_key] = self.hass.loop.time()
+
+            if not subscribed_entities:
+                _LOGGER.debug(
+                    'No updates scheduled for command "%s" on device %s'
+                    % (command.name, device.device_id)
                 )
             else:
                 protocol_id = self.devices_config_entries[device.device_id][
@@ -179,24 +333,147 @@ class HekrData:
                     attribute_filter(data) if callable(attribute_filter) else data
                 )
 
-                tasks = [
-                    asyncio.create_task(entity.handle_data_update(attributes))
-                    for entity in update_entities
-                    if entity.command_receive == command.name
-                ]
+                previous_attributes = self.last_attributes.get(command_key)
+                if echoed_attributes is not None and previous_attributes is not None:
+                    attributes = {
+                        **previous_attributes,
+                        **{
+                            key: value
+                            for key, value in attributes.items()
+                            if key in echoed_attributes
+                        },
+                    }
+                self.last_attributes[command_key] = attributes
+
+                if previous_attributes is None:
+                    update_entities = subscribed_entities
+                else:
+                    changed_keys = [
+                        key
+                        for key, value in attributes.items()
+                        if key not in previous_attributes
+                        or previous_attributes[key] != value
+                    ]
+                    changed_keys.extend(previous_attributes.keys() - attributes.keys())
+
+                    if changed_keys:
+                        attribute_index = self.attribute_entities[command_key]
+                        update_entities = dict.fromkeys(
+                            chain(
+                                attribute_index.get(MONITORED_CONDITIONS_ALL, ()),
+                                *(attribute_index.get(key, ()) for key in changed_keys),
+                            )
+                        )
+                    else:
+                        update_entities = ()
+
+                # entities holding back writes re-evaluate on every frame
+                throttled_entities = self.throttled_entities.setdefault(
+                    command_key, set()
+                )
+                if throttled_entities:
+                    update_entities = dict.fromkeys(
+                        chain(update_entities, throttled_entities)
+                    )
 
-                if tasks:
+                updated_entities = []
+                for entity in update_entities:
+                    if entity.handle_data_update(attributes):
+                        updated_entities.append(entity)
+                    if entity.write_pending:
+                        throttled_entities.add(entity)
+                    else:
+                        throttled_entities.discard(entity)
+
+                for entity in updated_entities:
+                    entity.async_write_ha_state()
+
+                if updated_entities and received_at is not None:
+                    latency = self.hass.loop.time() - received_at
+                    self.frame_latency.record(latency)
                     _LOGGER.debug(
-                        'Performing update on %d entities for command "%s"'
-                        % (len(tasks), command.name)
+                        'Updated %d of %d entities for command "%s" %.3f ms after arrival',
+                        len(updated_entities),
+                        len(subscribed_entities),
+                        command.name,
+                        latency * 1000,
                     )
-                    await asyncio.wait(tasks)
-                    _LOGGER.debug("Update complete!")
                 else:
                     _LOGGER.debug(
-                        'No updates scheduled for command "%s"' % command.name
+                        'Updated %d of %d entities for command "%s"',
+                        len(updated_entities),
+                        len(subscribed_entities),
+                        command.name,
                     )
 
+    # Entity dispatch management
+    def add_entity(self, device_id: DeviceID, entity: "HekrEntity") -> None:
+        """
+        Subscribe entity to updates from device.
+        :param device_id: Device ID
+        :param entity: Entity to subscribe
+        """
+        command_key = (device_id, entity.command_receive)
+
+        self.device_entities.setdefault(device_id, []).append(entity)
+        self.command_entities.setdefault(command_key, []).append(entity)
+
+        attribute_index = self.attribute_entities.setdefault(command_key, {})
+        for key in entity.watched_attributes:
+            attribute_index.setdefault(key, []).append(entity)
+
+        # next frame must reach the new entity regardless of changes
+        self.last_attributes.pop(command_key, None)
+
+        self.schedule_refresh(device_id)
+
+    def forget_attributes(self, device_id: DeviceID, command: str) -> None:
+        """
+        Forget data last received with command, so that the next frame is applied to
+        every subscribed entity regardless of changes (e.g. after entity state has
+        been written locally, without data from the device).
+        :param device_id: Device ID
+        :param command: Receive command name
+        """
+        self.last_attributes.pop((device_id, command), None)
+
+    def remove_entity(self, device_id: DeviceID, entity: "HekrEntity") -> None:
+        """
+        Unsubscribe entity from updates from device.
+        :param device_id: Device ID
+        :param entity: Entity to unsubscribe
+        """
+        device_entities = self.device_entities.get(device_id)
+        if not device_entities or entity not in device_entities:
+            return
+
+        device_entities.remove(entity)
+
+        command_key = (device_id, entity.command_receive)
+        command_entities = self.command_entities.get(command_key)
+        if command_entities is not None:
+            command_entities.remove(entity)
+            if not command_entities:
+                del self.command_entities[command_key]
+                self.last_attributes.pop(command_key, None)
+
+        throttled_entities = self.throttled_entities.get(command_key)
+        if throttled_entities is not None:
+            throttled_entities.discard(entity)
+
+        attribute_index = self.attribute_entities.get(command_key)
+        if attribute_index is not None:
+            for key in entity.watched_attributes:
+                key_entities = attribute_index.get(key)
+                if key_entities is not None and entity in key_entities:
+                    key_entities.remove(entity)
+                    if not key_entities:
+                        del attribute_index[key]
+            if not attribute_index:
+                del self.attribute_entities[command_key]
+
+        self.schedule_refresh(device_id)
+
     # Device registry management
     def get_device_info_dict(self, device_id: DeviceID):
         device = self.devices.get(device_id)
@@ -291,9 +568,43 @@ class HekrData:
 
     # Device setup methods
     def add_device(self, device: Device, device_cfg: Optional[ConfigType]):
-        device.add_callback(self.callback_update_entities)
-        self.devices[device.device_id] = device
-        self.devices_config_entries[device.device_id] = device_cfg
+        device_id = device.device_id
+        if device_id in self.devices:
+            # device set up locally overrides the one added from account
+            self._unindex_device(device_id)
+
+        self.devices[device_id] = device
+        self.devices_config_entries[device_id] = device_cfg
+
+        if not device_cfg:
+            return
+
+        account_id = device_cfg.get(CONF_ACCOUNT)
+        if account_id is not None:
+            self.account_devices.setdefault(account_id, {})[device_id] = device
+
+        host = device_cfg.get(CONF_HOST)
+        if host is not None:
+            self.host_devices.setdefault(host, set()).add(device_id)
+
+    def _unindex_device(self, device_id: DeviceID) -> None:
+        device_cfg = self.devices_config_entries.get(device_id)
+        if not device_cfg:
+            return
+
+        account_id = device_cfg.get(CONF_ACCOUNT)
+        account_devices = self.account_devices.get(account_id)
+        if account_devices is not None:
+            account_devices.pop(device_id, None)
+            if not account_devices:
+                del self.account_devices[account_id]
+
+        host = device_cfg.get(CONF_HOST)
+        host_devices = self.host_devices.get(host)
+        if host_devices is not None:
+            host_devices.discard(device_id)
+            if not host_devices:
+                del self.host_devices[host]
 
     def create_local_device(self, device_cfg: ConfigType) -> Device:
         """
@@ -313,9 +624,10 @@ class HekrData:
                 % (protocol_id, device_cfg.get(CONF_DEVICE_ID))
             )
 
-        connector = LocalConnector(
+        connector = SharedLocalConnector(
             host=device_cfg.get(CONF_HOST),
             port=connect_port,
+            endpoint_pool=self.udp_endpoints,
             application_id=device_cfg.get(CONF_APPLICATION_ID, DEFAULT_APPLICATION_ID),
         )
         connector.timeout = device_cfg.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
@@ -339,7 +651,7 @@ class HekrData:
         return device
 
     # Account setup methods
-    def create_account(self, account_cfg: ConfigType) -> Account:
+    def create_account(self, account_cfg: ConfigType) -> HekrAccount:
         """
         Create account
         :param account_cfg:
@@ -347,11 +659,9 @@ class HekrData:
         """
         _LOGGER.debug("Creating account with config: %s" % account_cfg)
 
-        from hekrapi.account import Account
-
         account_id = account_cfg[CONF_USERNAME]
 
-        account = Account(
+        account = HekrAccount(
             username=account_id,
             password=account_cfg[CONF_PASSWORD],
         )
@@ -363,50 +673,337 @@ class HekrData:
         return account
 
     async def update_account(self, account_id: Username) -> bool:
+        """
+        Add devices of account. When device listing of the account is cached, devices
+        are added from the cache right away, and the listing is revalidated against
+        the cloud in the background. Otherwise, setup waits for the cloud.
+        :param account_id: Account ID (username)
+        :return: Any devices have been added
+        """
+        listing = await self.account_cache.async_get(account_id)
+        if listing:
+            account = self.accounts[account_id]
+            devices = {}
+            for device_id, cached_device in listing.items():
+                protocol = SUPPORTED_PROTOCOLS.get(cached_device["protocol"])
+                if protocol is None:
+                    continue
+
+                device = account.devices.get(device_id)
+                if device is None:
+                    device = Device(device_id=device_id, control_key=None)
+                    device.account = account
+                device.device_info = cached_device["device_info"]
+                device.protocol = protocol[PROTOCOL_DEFINITION]
+                devices[device_id] = device
+
+            devices_added = self._add_account_devices(account_id, devices)
+            if devices_added:
+                _LOGGER.debug(
+                    "Added %d devices from cached listing of account %s"
+                    % (len(devices_added), account_id)
+                )
+                self.hass.async_create_background_task(
+                    self.revalidate_account(account_id),
+                    name="hekr_revalidate_" + account_id,
+                )
+                self.create_account_sync(account_id)
+                return True
+
+        devices_added, _ = await self.sync_account(account_id)
+        if not devices_added:
+            _LOGGER.warning(
+                "Account %s is added with no devices. Please, remove it from configuration if you don't plan on "
+                "getting any devices (updated on restart) from it." % account_id
+            )
+            return False
+
+        self.create_account_sync(account_id)
+        return True
+
+    async def sync_account(
+        self, account_id: Username, authenticate: bool = True, startup: bool = True
+    ) -> tuple[set[DeviceID], set[DeviceID]]:
+        """
+        Authenticate account and retrieve its device listing from the cloud. Devices
+        new to the listing are added, and the listing is stored in cache.
+        :param account_id: Account ID (username)
+        :param authenticate: (optional) Authenticate account; periodic synchronization
+                             relies on the token kept fresh by the token manager
+        :param startup: (optional) Run jobs under startup orchestrator; synchronization
+                        after startup runs outside of it
+        :return: IDs of added devices, IDs of devices missing from the listing
+        """
         account_cfg = self.accounts_config_entries[account_id]
         account = self.accounts[account_id]
-        customize_cfg = account_cfg.get(CONF_CUSTOMIZE, {})
+        timeout = account_cfg.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
 
-        protocols = {
-            protocol_id: protocol[PROTOCOL_DEFINITION]
-            for protocol_id, protocol in SUPPORTED_PROTOCOLS.items()
-        }
+        if authenticate:
+            if account_id in self.token_manager:
+                # join token refresh instead of logging in once more
+                await self.token_manager.async_refresh(account_id)
+            else:
+                await self._run_account_job(
+                    STAGE_AUTHENTICATE, account.authenticate(), startup
+                )
+        devices_info = await self._run_account_job(
+            STAGE_LIST_DEVICES, account.get_devices(), startup
+        )
+
+        for device_id, device_attributes in devices_info.items():
+            # devices added from cache get their connectors once the account is online
+            device = account.devices.get(device_id)
+            if device is not None and device.connector is None:
+                device.connector = account.get_connector(
+                    connect_host=device_attributes["dcInfo"]["connectHost"]
+                )
+
+        # protocols are matched through the registry once devices are added
+        await account.update_devices(devices_info=devices_info, with_timeout=timeout)
+
+        if account_cfg.get(CONF_DETECT_PROTOCOLS, False):
+            await self.detect_account_protocols(
+                account_id, devices_info.keys(), startup
+            )
+
+        devices_removed = self.get_account_devices(account_id).keys() - devices_info
+        devices_added = self._add_account_devices(
+            account_id,
+            {device_id: account.devices[device_id] for device_id in devices_info},
+        )
+        if devices_added:
+            _LOGGER.debug(
+                "Added %d devices from account %s" % (len(devices_added), account_id)
+            )
 
-        await account.authenticate()
-        await account.update_devices(
-            protocols=protocols.values(),
-            with_timeout=account_cfg.get(CONF_TIMEOUT, DEFAULT_TIMEOUT),
+        await self.account_cache.async_set(
+            account_id,
+            {
+                device_id: {
+                    "protocol": self.devices_config_entries[device_id][CONF_PROTOCOL],
+                    "device_info": device.device_info,
+                }
+                for device_id, device in self.get_account_devices(account_id).items()
+                if device_id in devices_info
+            },
         )
 
-        devices_added = 0
-        for device_id, device in account.devices.items():
+        if authenticate and account_id not in self.token_manager:
+            self.token_manager.add(
+                account_id, account, account_cfg.get(CONF_TOKEN_UPDATE_INTERVAL)
+            )
+
+        for connector in account.connectors.values():
+            if connector.is_connected:
+                continue
+            if startup:
+                self.startup.schedule(
+                    STAGE_CONNECT_CLOUD, account_id, self.connect_connector(connector)
+                )
+            else:
+                self.hass.async_create_background_task(
+                    self.connect_connector(connector),
+                    name="hekr_%s_%s" % (STAGE_CONNECT_CLOUD, account_id),
+                )
+
+        return devices_added, devices_removed
+
+    async def _run_account_job(self, stage: str, job: Coroutine, startup: bool) -> Any:
+        if startup:
+            return await self.startup.run(stage, job)
+        return await job
+
+    async def revalidate_account(
+        self, account_id: Username, startup: bool = True
+    ) -> None:
+        """
+        Revalidate devices added from cached listing against the cloud. Changes to
+        the set of devices are applied in place; failures are retried.
+        :param account_id: Account ID (username)
+        :param startup: (optional) Revalidation is part of startup (retries are not)
+        """
+        try:
+            devices_added, devices_removed = await self.sync_account(
+                account_id, startup=startup
+            )
+        except (HekrAPIException, ClientError, OSError, TimeoutError) as e:
+            _LOGGER.warning(
+                "Could not revalidate cached devices of account %s, retrying in %d "
+                "seconds: %s" % (account_id, DEFAULT_ACCOUNT_RETRY_INTERVAL, e)
+            )
+            self.account_retries[account_id] = async_call_later(
+                self.hass,
+                DEFAULT_ACCOUNT_RETRY_INTERVAL,
+                partial(self._retry_account_revalidation, account_id),
+            )
+            return
+
+        await self.apply_account_changes(account_id, devices_added, devices_removed)
+
+    @callback
+    def _retry_account_revalidation(self, account_id: Username, *_) -> None:
+        self.account_retries.pop(account_id, None)
+        if account_id in self.accounts:
+            self.hass.async_create_background_task(
+                self.revalidate_account(account_id, startup=False),
+                name="hekr_revalidate_" + account_id,
+            )
+
+    async def resync_account(self, account_id: Username) -> None:
+        """
+        Synchronize devices of account with its device listing in the cloud. Failures
+        are left to the next synchronization.
+        :param account_id: Account ID (username)
+        """
+        try:
+            devices_added, devices_removed = await self.sync_account(
+                account_id, authenticate=False, startup=False
+            )
+        except (HekrAPIException, ClientError, OSError, TimeoutError) as e:
+            _LOGGER.warning(
+                "Could not synchronize devices of account %s: %s" % (account_id, e)
+            )
+            return
+
+        await self.apply_account_changes(account_id, devices_added, devices_removed)
+
+    async def apply_account_changes(
+        self,
+        account_id: Username,
+        devices_added: set[DeviceID],
+        devices_removed: set[DeviceID],
+    ) -> None:
+        """
+        Bring entities of account up to date with changes to its device listing.
+        Devices present in both listings keep their entities, connectors and
+        listeners untouched.
+        :param account_id: Account ID (username)
+        :param devices_added: IDs of devices new to the listing (already added)
+        :param devices_removed: IDs of devices missing from the listing
+        """
+        if not (devices_added or devices_removed):
+            _LOGGER.debug("Devices of account %s are up to date" % account_id)
+            return
+
+        _LOGGER.info(
+            "Devices of account %s have changed (%d added, %d removed)"
+            % (account_id, len(devices_added), len(devices_removed))
+        )
+
+        for device_id in devices_removed:
+            await self.remove_account_device(account_id, device_id)
+
+        # platforms not set up yet pick new devices up on their own
+        platform_setups = self.account_platforms.get(account_id, {})
+        for device_id in devices_added:
+            device_cfg = self.devices_config_entries[device_id]
+            for setup_entities in platform_setups.values():
+                await setup_entities(config=device_cfg)
+
+    def register_account_platform(
+        self,
+        account_id: Username,
+        entity_domain: str,
+        setup_entities: Callable[..., Awaitable[bool]],
+    ) -> None:
+        """
+        Register entity setup of platform loaded for account, used to add entities of
+        devices which appear in account's listing later on.
+        :param account_id: Account ID (username)
+        :param entity_domain: Entity domain of platform
+        :param setup_entities: Coroutine function accepting device config
+        """
+        self.account_platforms.setdefault(account_id, {})[
+            entity_domain
+        ] = setup_entities
+
+    async def remove_account_device(
+        self, account_id: Username, device_id: DeviceID
+    ) -> None:
+        """
+        Remove device which has disappeared from account's listing, along with its
+        entities and registry entries. Its connector is closed only once no other
+        devices are attached to it.
+        :param account_id: Account ID (username)
+        :param device_id: Device ID
+        """
+        _LOGGER.debug("Removing device %s from account %s" % (device_id, account_id))
+
+        entity_registry = er.async_get(self.hass)
+        for entity in list(self.device_entities.get(device_id, ())):
+            entity_id = entity.entity_id
+            await entity.async_remove(force_remove=True)
+            if entity_id and entity_registry.async_get(entity_id) is not None:
+                entity_registry.async_remove(entity_id)
+        self.device_entities.pop(device_id, None)
+
+        device_registry = dr.async_get(self.hass)
+        device_entry = device_registry.async_get_device(
+            identifiers={(DOMAIN, device_id)}
+        )
+        if device_entry is not None:
+            device_registry.async_remove_device(device_entry.id)
+
+        device = self.devices.get(device_id)
+        await self.cleanup_device(device_id, close_connector=False)
+
+        account = self.accounts.get(account_id)
+        if account is not None:
+            account.devices.pop(device_id, None)
+
+        connector = device.connector if device is not None else None
+        if connector is None:
+            return
+
+        device.connector = None
+        if connector.devices:
+            return
+
+        if account is not None:
+            for connector_key, account_connector in list(account.connectors.items()):
+                if account_connector is connector:
+                    del account.connectors[connector_key]
+        await self.close_connectors((connector,))
+
+    def _add_account_devices(
+        self, account_id: Username, devices: dict[DeviceID, Device]
+    ) -> set[DeviceID]:
+        """
+        Add devices of account matching supported protocols.
+        :param account_id: Account ID (username)
+        :param devices: Device ID -> device object
+        :return: IDs of added devices
+        """
+        devices_added = set()
+        for device_id, device in devices.items():
             if device_id in self.devices:
                 _LOGGER.debug(
                     "Found existing device %s during account setup" % device_id
                 )
                 continue
 
-            new_device_cfg = customize_cfg.get(CONF_CUSTOMIZE, {})
+            new_device_cfg = self.devices_customize.get(device_id, {})
             if new_device_cfg is False:
                 _LOGGER.debug(
                     "Skipped adding device %s due to customize setting" % device_id
                 )
                 continue
 
-            elif CONF_PROTOCOL in new_device_cfg:
+            new_device_cfg = {**new_device_cfg}
+            if CONF_PROTOCOL in new_device_cfg:
                 protocol_id = new_device_cfg[CONF_PROTOCOL]
                 device.protocol = SUPPORTED_PROTOCOLS[protocol_id][PROTOCOL_DEFINITION]
 
-            elif not device.protocol or device.protocol not in protocols.values():
-                _LOGGER.warning(
-                    "Device %s does not operate under supported protocol, and therefore will not be added."
-                    % device_id
-                )
-                continue
-
             else:
-                protocol_order_number = list(protocols.values()).index(device.protocol)
-                protocol_id = list(protocols.keys())[protocol_order_number]
+                protocol_id = SUPPORTED_PROTOCOLS.match_device(device)
+                if protocol_id is None:
+                    _LOGGER.warning(
+                        "Device %s does not operate under supported protocol, and therefore will not be added."
+                        % device_id
+                    )
+                    continue
+
+                device.protocol = SUPPORTED_PROTOCOLS[protocol_id][PROTOCOL_DEFINITION]
                 new_device_cfg[CONF_PROTOCOL] = protocol_id
 
                 _LOGGER.debug(
@@ -420,77 +1017,178 @@ class HekrData:
             if CONF_NAME not in new_device_cfg:
                 new_device_cfg[CONF_NAME] = device.device_name
 
-            _LOGGER.debug("Adding device %s from account %s" % (device, account))
+            _LOGGER.debug("Adding device %s from account %s" % (device, account_id))
 
             self.add_device(device, new_device_cfg)
+            devices_added.add(device_id)
 
-            devices_added += 1
+        return devices_added
 
-        if not devices_added:
-            _LOGGER.warning(
-                "Account %s is added with no devices. Please, remove it from configuration if you don't plan on "
-                "getting any devices (updated on restart) from it." % account
-            )
-            return False
+    async def detect_account_protocols(
+        self,
+        account_id: Username,
+        device_ids: Iterable[DeviceID],
+        startup: bool = True,
+    ) -> None:
+        """
+        Detect protocols of account devices not matching any supported protocol by
+        probing them over LAN. Detected protocols are set on device objects.
+        :param account_id: Account ID (username)
+        :param device_ids: IDs of devices from account listing
+        :param startup: (optional) Run probing under startup orchestrator
+        """
+        account = self.accounts[account_id]
 
-        _LOGGER.debug("Added %d devices from account %s" % (devices_added, account_id))
+        targets = []
+        for device_id in device_ids:
+            if device_id in self.devices:
+                continue
 
-        self.create_account_updater(account_id)
+            device_customize = self.devices_customize.get(device_id, {})
+            if device_customize is False or CONF_PROTOCOL in device_customize:
+                continue
 
-        tasks = [
-            asyncio.create_task(connector.open_connection())
-            for connector in account.connectors.values()
-        ]
-        await asyncio.wait(tasks)
-        self.refresh_connections()
+            device = account.devices[device_id]
+            if SUPPORTED_PROTOCOLS.match_device(device) is not None:
+                continue
 
-        return True
+            host = (device.device_info or {}).get("lanIp")
+            if not host:
+                continue
 
-    def create_account_updater(self, account_id):
-        account = self.accounts[account_id]
-        account_cfg = self.accounts_config_entries[account_id]
+            targets.append(ProbeTarget(device_id, device.control_key, host))
 
-        if CONF_TOKEN_UPDATE_INTERVAL in account_cfg:
-            run_updater_at = now() + account_cfg[CONF_TOKEN_UPDATE_INTERVAL]
-        else:
-            run_updater_at = account.access_token_expires_at - timedelta(seconds=20)
+        if not targets:
+            return
+
+        _LOGGER.debug(
+            "Probing %d devices of account %s for protocols"
+            % (len(targets), account_id)
+        )
+        results = await self._run_account_job(
+            STAGE_DETECT_PROTOCOL,
+            self.protocol_prober.async_detect_many(targets, DEFAULT_PROBE_BUDGET),
+            startup,
+        )
+        for device_id, protocol_id in results.items():
+            if protocol_id is not None:
+                protocol = SUPPORTED_PROTOCOLS[protocol_id]
+                account.devices[device_id].protocol = protocol[PROTOCOL_DEFINITION]
 
-        self.account_updaters[account_id] = async_track_point_in_time(
-            hass=self.hass,
-            action=partial(self.update_account_authentication, account_id),
-            point_in_time=run_updater_at,
+    async def detect_local_protocol(self, device_cfg: ConfigType) -> Optional[str]:
+        """
+        Detect protocol of device configured for local access by probing it.
+        :param device_cfg: Device configuration
+        :return: Protocol ID, `None` if no protocol has been detected
+        """
+        return await self.startup.run(
+            STAGE_DETECT_PROTOCOL,
+            self.protocol_prober.async_detect(
+                ProbeTarget(
+                    device_cfg[CONF_DEVICE_ID],
+                    device_cfg.get(CONF_CONTROL_KEY),
+                    device_cfg[CONF_HOST],
+                ),
+                DEFAULT_PROBE_BUDGET,
+            ),
         )
 
+    def schedule_device_connection(self, device_id: DeviceID) -> None:
+        """
+        Open connection to device in the background, under startup concurrency limit.
+        :param device_id: Device ID
+        """
+        self.startup.schedule(
+            STAGE_CONNECT,
+            device_id,
+            self.connect_connector(self.devices[device_id].connector),
+        )
+
+    async def connect_connector(self, connector: "_BaseConnector") -> bool:
+        """
+        Open connector, and start updaters and listener of devices attached to it
+        afterwards. Connectors which cannot be opened are left to the updaters to
+        reconnect.
+        :param connector: Connector
+        :return: Connector has been opened
+        """
+        is_connected = False
+        try:
+            await connector.open_connection()
+            is_connected = True
+        except socket.gaierror as e:
+            _LOGGER.error(
+                "Invalid hostname or address provided for connector %s (error: %s)"
+                % (connector, e)
+            )
+        except (ConnectionTimeoutException, OSError) as e:
+            _LOGGER.warning("Could not open connector %s: %s" % (connector, e))
+        except HekrAPIException as e:
+            # e.g. control key or account token rejected by device or cloud
+            _LOGGER.error("Could not open connector %s: %s" % (connector, e))
+
+        for device_id in connector.devices.keys() & self.devices.keys():
+            self.schedule_refresh(device_id)
+
+        return is_connected
+
+    def create_account_sync(self, account_id: Username) -> None:
+        """
+        Schedule periodic synchronization of account's device listing.
+        :param account_id: Account ID (username)
+        """
+        self.remove_account_sync(account_id)
+        interval = self.accounts_config_entries[account_id].get(
+            CONF_SYNC_INTERVAL, DEFAULT_ACCOUNT_SYNC_INTERVAL
+        )
+        self.account_syncs[account_id] = async_track_time_interval(
+            self.hass,
+            partial(self._run_account_sync, account_id),
+            interval,
+            name="hekr_sync_" + account_id,
+        )
         _LOGGER.debug(
-            "Next updater scheduled for account %s: %s" % (account_id, run_updater_at)
+            "Devices of account %s will be synchronized every %s"
+            % (account_id, interval)
         )
 
-    def remove_account_updater(self, account_id):
-        if account_id in self.account_updaters:
-            self.account_updaters[account_id]()
-            del self.account_updaters[account_id]
+    def remove_account_sync(self, account_id: Username) -> None:
+        sync_canceller = self.account_syncs.pop(account_id, None)
+        if sync_canceller is not None:
+            sync_canceller()
 
-    async def update_account_authentication(self, account_id, *_):
-        _LOGGER.debug("Updating account %s authentication" % account_id)
-        account = self.accounts[account_id]
+        sync_task = self.account_sync_tasks.pop(account_id, None)
+        if sync_task is not None:
+            sync_task.cancel()
 
-        try:
-            await account.refresh_authentication()
-        except HekrAPIException:
-            _LOGGER.exception(
-                "Hekr API exception occurred during account authentication update:"
+    @callback
+    def _run_account_sync(self, account_id: Username, *_) -> None:
+        if account_id in self.account_sync_tasks:
+            _LOGGER.debug(
+                "Previous synchronization of account %s is still running" % account_id
             )
+            return
 
-        _LOGGER.debug("Updating authentication on account %s successful" % account_id)
+        sync_task = self.hass.async_create_background_task(
+            self.resync_account(account_id), name="hekr_sync_" + account_id
+        )
+        self.account_sync_tasks[account_id] = sync_task
+
+        def _finish_sync(task: asyncio.Task) -> None:
+            if self.account_sync_tasks.get(account_id) is task:
+                del self.account_sync_tasks[account_id]
 
-        self.create_account_updater(account_id)
+        sync_task.add_done_callback(_finish_sync)
 
     def get_account_devices(self, account_id: str) -> dict[DeviceID, Device]:
-        return {
-            device_id: self.devices[device_id]
-            for device_id, config in self.devices_config_entries.items()
-            if config.get(CONF_ACCOUNT) == account_id
-        }
+        return dict(self.account_devices.get(account_id, {}))
+
+    def get_device_account(self, device_id: DeviceID) -> Optional[Username]:
+        device_cfg = self.devices_config_entries.get(device_id)
+        return device_cfg.get(CONF_ACCOUNT) if device_cfg else None
+
+    def get_host_devices(self, host: str) -> set[DeviceID]:
+        return set(self.host_devices.get(host, ()))
 
     async def cleanup_account(self, account_id: str):
         account = self.accounts.get(account_id)
@@ -498,30 +1196,123 @@ class HekrData:
             # @TODO: better cleanup?
             return True
 
-        self.remove_account_updater(account_id)
+        self.token_manager.remove(account_id)
+        self.remove_account_sync(account_id)
+        self.account_platforms.pop(account_id, None)
+        retry_canceller = self.account_retries.pop(account_id, None)
+        if retry_canceller is not None:
+            retry_canceller()
 
         self.accounts.pop(account_id)
         self.accounts_config_entries.pop(account_id)
         # @TODO: remove devices
 
-    async def cleanup_device(self, device_id: str, with_refresh: bool = True):
+    async def close_connectors(
+        self,
+        connectors: Iterable["_BaseConnector"],
+        timeout: float = DEFAULT_SHUTDOWN_TIMEOUT,
+    ) -> None:
+        """
+        Stop listeners and close connections of connectors concurrently. Connectors
+        which do not close before the deadline are abandoned.
+        :param connectors: Connectors
+        :param timeout: Deadline (in seconds) for all connectors to close
+        """
+        close_tasks = {}
+        for connector in connectors:
+            listener = connector.listener
+            if listener is not None and listener.is_running:
+                _LOGGER.debug("Shutting down listener for connector %s" % connector)
+                listener.stop()
+
+            if connector.is_connected:
+                _LOGGER.debug("Shutting down connector %s" % connector)
+                close_task = self.hass.async_create_background_task(
+                    connector.close_connection(), name="hekr_close_%s" % connector
+                )
+                close_tasks[close_task] = connector
+
+        if not close_tasks:
+            return
+
+        started_at = self.hass.loop.time()
+        done, pending = await asyncio.wait(close_tasks, timeout=timeout)
+
+        for close_task in done:
+            exception = close_task.exception()
+            if exception is not None:
+                _LOGGER.debug(
+                    "Could not close connector %s: %s"
+                    % (close_tasks[close_task], exception)
+                )
+
+        for close_task in pending:
+            _LOGGER.warning(
+                "Connector %s did not close within %.1f seconds, abandoning it"
+                % (close_tasks[close_task], timeout)
+            )
+            close_task.cancel()
+
+        _LOGGER.debug(
+            "Closed %d of %d connectors in %.3f seconds"
+            % (
+                len(done),
+                len(close_tasks),
+                self.hass.loop.time() - started_at,
+            )
+        )
+
+    async def cleanup_devices(self, device_ids: Iterable[DeviceID]) -> None:
+        """
+        Clean up multiple devices, closing their connectors concurrently.
+        :param device_ids: Device IDs
+        """
+        device_ids = list(device_ids)
+        await self.close_connectors(
+            {
+                self.devices[device_id].connector
+                for device_id in device_ids
+                if device_id in self.devices
+                and self.devices[device_id].connector is not None
+            }
+        )
+        for device_id in device_ids:
+            await self.cleanup_device(device_id, close_connector=False)
+
+    async def cleanup_device(
+        self, device_id: str, with_refresh: bool = True, close_connector: bool = True
+    ):
         device = self.devices.get(device_id)
         if device:
-            if (
-                device.connector.listener is not None
-                and device.connector.listener.is_running
-            ):
-                device.connector.listener.stop()
-            await device.connector.close_connection()
+            # devices added from cached listing may have no connector yet
+            connector = device.connector
+            if close_connector and connector is not None:
+                await self.close_connectors((connector,))
             del self.devices[device_id]
 
+            if with_refresh and connector is not None:
+                # devices sharing the connector may still require its listener
+                for sibling_id in connector.devices:
+                    if sibling_id in self.devices:
+                        self.schedule_refresh(sibling_id)
+
         if device_id in self.devices_config_entries:
+            self._unindex_device(device_id)
             del self.devices_config_entries[device_id]
 
         self.remove_device_updater(device_id)
 
-        if with_refresh:
-            self.refresh_connections()
+        command_queue = self.command_queues.pop(device_id, None)
+        if command_queue is not None:
+            command_queue.stop()
+        self.rtt_estimators.pop(device_id, None)
+        self.device_health.pop(device_id, None)
+        self.protocol_prober.forget(device_id)
+
+        for push_key in [key for key in self.push_timestamps if key[0] == device_id]:
+            del self.push_timestamps[push_key]
+
+        self.pending_refreshes.discard(device_id)
 
     # Updater and listener management
     def _create_updater(
@@ -535,7 +1326,7 @@ class HekrData:
         :return: Updater cancel function
         """
 
-        async def call_command(*_):
+        async def call_command():
             device = self.devices.get(device_id)
             if device is None:
                 _LOGGER.debug(
@@ -543,130 +1334,498 @@ class HekrData:
                 )
                 return
 
+            poll_commands = commands
+            if self.devices_config_entries[device_id].get(
+                CONF_PUSH_AWARE_POLLING, DEFAULT_PUSH_AWARE_POLLING
+            ):
+                poll_commands, next_poll_in = self._get_stale_commands(
+                    device_id, commands, interval.total_seconds()
+                )
+                if not poll_commands:
+                    _LOGGER.debug(
+                        'Device "%s" pushed fresh data for all commands, delaying '
+                        "updater by %.1f seconds" % (device_id, next_poll_in)
+                    )
+                    self.poll_scheduler.reschedule(device_id, next_poll_in)
+                    return
+
             _LOGGER.debug(
                 'Running updater for device "%s" with commands: %s'
-                % (device_id, ", ".join(commands))
+                % (device_id, ", ".join(poll_commands))
+            )
+            for command in poll_commands:
+                _LOGGER.debug("Running update command: %s" % command)
+                state = await self.command_and_wait(
+                    device, command, priority=CommandPriority.POLL
+                )
+                if state is None:
+                    # device is not responding, do not wait out remaining commands
+                    break
+
+        return self.poll_scheduler.add(
+            device_id=device_id, interval=interval, action=call_command
+        )
+
+    def _get_stale_commands(
+        self, device_id: DeviceID, commands: set[str], max_age: float
+    ) -> tuple[set[str], float]:
+        """
+        Filter out update commands whose data has been pushed by the device recently.
+        :param device_id: Device ID
+        :param commands: Update commands
+        :param max_age: Age (in seconds) after which pushed data is considered stale
+        :return: Commands to poll, seconds until the earliest pushed data becomes stale
+        """
+        loop_time = self.hass.loop.time()
+        stale_commands = set()
+        next_poll_in = max_age
+
+        for command in commands:
+            receive_commands = {
+                entity.command_receive
+                for entity in self.device_entities.get(device_id, ())
+                if entity.command_update == command
+            }
+            pushed_at = [
+                self.push_timestamps.get((device_id, receive_command))
+                for receive_command in receive_commands
+            ]
+            if not pushed_at or None in pushed_at:
+                stale_commands.add(command)
+                continue
+
+            fresh_for = min(pushed_at) + max_age - loop_time
+            if fresh_for <= 0:
+                stale_commands.add(command)
+            else:
+                next_poll_in = min(next_poll_in, fresh_for)
+
+        return stale_commands, next_poll_in
+
+    def get_command_queue(self, device_id: DeviceID) -> DeviceCommandQueue:
+        command_queue = self.command_queues.get(device_id)
+        if command_queue is None:
+            command_queue = DeviceCommandQueue(self.hass, device_id)
+            self.command_queues[device_id] = command_queue
+        return command_queue
+
+    async def command_and_wait(
+        self,
+        device: Device,
+        command: str,
+        arguments: Optional[dict] = None,
+        receive_command: Optional[str] = None,
+        priority: CommandPriority = CommandPriority.USER,
+        replace_key: Optional[Hashable] = None,
+    ) -> Optional[DeviceResponseState]:
+        """
+        Queue command for device and wait for a response with matching message ID.
+        Commands are sent one at a time per device, with user commands ahead of polls.
+        Identical queries issued concurrently share one outgoing frame and response.
+        :param device: Device to execute command on
+        :param command: Command name
+        :param arguments: (optional) Command arguments
+        :param receive_command: (optional) Receive command of entities affected by a write
+                                command; response data is applied to them right away, and
+                                counts as fresh data for the device's poll
+        :param priority: (optional) Command priority
+        :param replace_key: (optional) Key of commands superseding each other; a command
+                            still queued when a newer one with the same key arrives is
+                            not sent, and shares the result of the newer one
+        :return: Response state, `None` on timeout
+        """
+        state = None
+        try:
+            state = await self.get_command_queue(device.device_id).execute(
+                partial(
+                    self._send_and_wait, device, command, arguments, receive_command
+                ),
+                priority=priority,
+                flight_key=(
+                    get_command_key(command, arguments)
+                    if receive_command is None
+                    else None
+                ),
+                replace_key=replace_key,
+            )
+            return state
+        finally:
+            # entities may hold state which an unconfirmed write has not applied
+            if receive_command is not None and state in (
+                None,
+                DeviceResponseState.FAILURE,
+            ):
+                self.forget_attributes(device.device_id, receive_command)
+
+    async def _send_and_wait(
+        self,
+        device: Device,
+        command: str,
+        arguments: Optional[dict],
+        receive_command: Optional[str],
+    ) -> Optional[DeviceResponseState]:
+        """
+        Execute command on device and wait for a response with matching message ID.
+        Response timeouts derive from the device's round-trip time estimate, and
+        commands are resent on timeout. Waiting is bounded by the device's connector
+        timeout in total. Missing responses are accounted for in device health; for
+        devices considered offline, connection and listener are re-established first.
+        """
+        loop = self.hass.loop
+        if device.connector is None:
+            # devices added from cached listing get connectors once account is online
+            _LOGGER.debug(
+                'Device "%s" has no connector yet, not sending command "%s"'
+                % (device.device_id, command)
             )
-            device = self.devices[device_id]
-            command_iter = iter(commands)
-            first_command = next(command_iter)
+            return None
 
-            _LOGGER.debug("Running update command: %s" % first_command)
-            await device.command(first_command)
-            for command in command_iter:
+        if self.is_device_offline(device.device_id):
+            try:
+                await self._prepare_offline_device(device)
+            except (HekrAPIException, OSError) as e:
                 _LOGGER.debug(
-                    "Sleeping for %d seconds before running command: %s"
-                    % (DEFAULT_SLEEP_INTERVAL, command)
+                    'Could not connect to offline device "%s": %s'
+                    % (device.device_id, e)
                 )
-                await asyncio.sleep(DEFAULT_SLEEP_INTERVAL)
-                _LOGGER.debug("Running update command: %s" % command)
-                await device.command(command)
+                self._record_device_failure(device)
+                return None
 
-        len_cmd = len(commands)
-        # assumed: 1 second per command, N second(-s) intervals between commands
-        min_seconds = len_cmd + (len_cmd - 1) * DEFAULT_SLEEP_INTERVAL
-        if interval.seconds < min_seconds:
-            _LOGGER.warning(
-                "Interval provided for updater (%d seconds) is too low to perform updates! "
-                "Adjusted automatically to %d seconds to prevent hiccups."
-                % (interval.seconds, min_seconds)
+        max_timeout = device.connector.timeout
+        deadline = loop.time() + max_timeout
+        estimator = self.get_rtt_estimator(device.device_id)
+
+        for attempt in range(DEFAULT_COMMAND_RETRIES + 1):
+            try:
+                connector = await device.open_connection()
+            except (ConnectionTimeoutException, OSError) as e:
+                _LOGGER.debug(
+                    'Could not connect to device "%s": %s' % (device.device_id, e)
+                )
+                break
+
+            # waiter is registered ahead of sending, as responses are dispatched once
+            # they arrive, possibly before sending returns (e.g. over websockets);
+            # open connectors assign the next message ID to the request without yielding
+            waiter = loop.create_future()
+            waiter_key = (device.device_id, connector.last_message_id + 1)
+            self.response_waiters[waiter_key] = waiter
+            if receive_command is not None:
+                self.write_responses[waiter_key] = receive_command
+
+            try:
+                try:
+                    message_id = await device.command(command, arguments)
+                except (ConnectionTimeoutException, OSError) as e:
+                    _LOGGER.debug(
+                        'Could not send command "%s" to device "%s": %s'
+                        % (command, device.device_id, e)
+                    )
+                    break
+
+                if message_id != waiter_key[1]:
+                    # connector has assigned message ID differently
+                    self.response_waiters.pop(waiter_key, None)
+                    self.write_responses.pop(waiter_key, None)
+                    waiter_key = (device.device_id, message_id)
+                    self.response_waiters[waiter_key] = waiter
+                    if receive_command is not None:
+                        self.write_responses[waiter_key] = receive_command
+
+                sent_at = loop.time()
+                timeout = min(estimator.get_timeout(max_timeout), deadline - sent_at)
+
+                try:
+                    async with asyncio.timeout(timeout):
+                        state = await waiter
+                except TimeoutError:
+                    estimator.add_timeout()
+                    _LOGGER.debug(
+                        'Response to command "%s" (message ID: %d, attempt %d) on '
+                        'device "%s" timed out after %.3f seconds'
+                        % (command, message_id, attempt + 1, device.device_id, timeout)
+                    )
+                    if loop.time() >= deadline:
+                        break
+                else:
+                    estimator.add_sample(loop.time() - sent_at)
+                    return state
+            finally:
+                if self.response_waiters.get(waiter_key) is waiter:
+                    del self.response_waiters[waiter_key]
+                self.write_responses.pop(waiter_key, None)
+
+        self._record_device_failure(device)
+        return None
+
+    def get_rtt_estimator(self, device_id: DeviceID) -> RTTEstimator:
+        estimator = self.rtt_estimators.get(device_id)
+        if estimator is None:
+            estimator = RTTEstimator(min_timeout=DEFAULT_MIN_COMMAND_TIMEOUT)
+            self.rtt_estimators[device_id] = estimator
+        return estimator
+
+    def get_device_health(self, device_id: DeviceID) -> DeviceHealth:
+        health = self.device_health.get(device_id)
+        if health is None:
+            health = DeviceHealth(
+                offline_threshold=DEFAULT_OFFLINE_THRESHOLD,
+                backoff_min=DEFAULT_OFFLINE_BACKOFF_MIN,
+                backoff_max=DEFAULT_OFFLINE_BACKOFF_MAX,
             )
-            interval = timedelta(seconds=min_seconds)
+            self.device_health[device_id] = health
+        return health
+
+    def is_device_offline(self, device_id: DeviceID) -> bool:
+        health = self.device_health.get(device_id)
+        return health is not None and health.is_offline
+
+    @callback
+    def _record_device_frame(self, device_id: DeviceID) -> None:
+        """
+        Close device circuit breaker after receiving any frame from it.
+        :param device_id: Device ID
+        """
+        health = self.device_health.get(device_id)
+        if health is None or health.state == DeviceHealthState.HEALTHY:
+            return
+
+        previous_state = health.record_success(self.hass.loop.time())
+        if previous_state == DeviceHealthState.OFFLINE:
+            _LOGGER.info('Device "%s" is responding again' % device_id)
+            # poll right away; when the frame answers a running poll, the slot is
+            # skipped and polling continues with regular interval
+            self.poll_scheduler.reschedule(device_id, 0.0)
+            self.schedule_refresh(device_id)
+        else:
+            _LOGGER.debug('Device "%s" has recovered' % device_id)
+
+    @callback
+    def _record_device_failure(self, device: Device) -> None:
+        """
+        Account for a missing response from device. Degraded devices are polled again
+        sooner than usual to confirm their state; offline devices have their entities
+        marked unavailable, their connector released, and are polled with exponential
+        backoff until they respond.
+        :param device: Device
+        """
+        device_id = device.device_id
+        health = self.get_device_health(device_id)
+        was_offline = health.is_offline
+        state = health.record_failure(self.hass.loop.time())
+        retry_delay = health.get_retry_delay()
+
+        if state == DeviceHealthState.OFFLINE:
+            if not was_offline:
+                _LOGGER.warning(
+                    'Device "%s" is not responding, marking it offline' % device_id
+                )
+                self._set_device_offline(device_id)
+                self.hass.async_create_background_task(
+                    self._release_connector(device.connector),
+                    name="hekr_release_" + device_id,
+                )
+        elif device_id in self.device_updaters:
+            retry_delay = min(
+                retry_delay, self.get_scan_interval(device_id).total_seconds()
+            )
+
+        if device_id in self.device_updaters:
+            _LOGGER.debug(
+                'Device "%s" is %s after %d missed responses, polling again in '
+                "%.1f seconds" % (device_id, state.value, health.failures, retry_delay)
+            )
+            self.poll_scheduler.reschedule(device_id, retry_delay)
+
+    @callback
+    def _set_device_offline(self, device_id: DeviceID) -> None:
+        """
+        Mark entities of device unavailable and forget data received from it, so
+        that the first frame after recovery is applied to every entity.
+        :param device_id: Device ID
+        """
+        for command_key in [key for key in self.last_attributes if key[0] == device_id]:
+            del self.last_attributes[command_key]
+        for command_key, throttled_entities in self.throttled_entities.items():
+            if command_key[0] == device_id:
+                throttled_entities.clear()
+        for push_key in [key for key in self.push_timestamps if key[0] == device_id]:
+            del self.push_timestamps[push_key]
+
+        for entity in self.device_entities.get(device_id, ()):
+            if entity.handle_device_offline():
+                entity.async_write_ha_state()
+
+    async def _prepare_offline_device(self, device: Device) -> None:
+        """
+        Re-establish connection and listener released for an offline device.
+        :param device: Device
+        """
+        connector = device.connector
+        if not connector.is_connected:
+            await connector.open_connection()
+
+        listener = connector.get_listener(listener_factory=self._create_listener)
+        if not listener.is_running:
+            listener.start()
+
+    async def _release_connector(self, connector: "_BaseConnector") -> None:
+        """
+        Stop listener and close connection of connector when every device attached
+        to it is offline.
+        :param connector: Connector
+        """
+        if not all(
+            self.is_device_offline(device_id)
+            for device_id in connector.devices
+            if device_id in self.devices
+        ):
+            return
+
+        _LOGGER.debug("Releasing connector %s of offline devices" % connector)
+        listener = connector.listener
+        if listener is not None and listener.is_running:
+            listener.stop()
+        if connector.is_connected:
+            try:
+                await connector.close_connection()
+            except (HekrAPIException, OSError):
+                _LOGGER.debug("Could not close connector %s" % connector)
+
+    def reset_poll_timer(self, device_id: DeviceID) -> None:
+        """
+        Postpone device poll when data for all of its update commands is fresh.
+        :param device_id: Device ID
+        """
+        updater = self.device_updaters.get(device_id)
+        if updater is None:
+            return
 
-        # noinspection PyTypeChecker
-        return async_track_time_interval(
-            hass=self.hass, action=call_command, interval=interval
+        stale_commands, next_poll_in = self._get_stale_commands(
+            device_id, updater[0], self.get_scan_interval(device_id).total_seconds()
         )
+        if not stale_commands:
+            _LOGGER.debug(
+                'Resetting poll timer for device "%s" to %.1f seconds'
+                % (device_id, next_poll_in)
+            )
+            self.poll_scheduler.reschedule(device_id, next_poll_in)
+
+    def get_scan_interval(self, device_id: DeviceID) -> timedelta:
+        device_cfg = self.devices_config_entries[device_id]
+        interval = device_cfg.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        if isinstance(interval, int):
+            interval = timedelta(seconds=interval)
+        return interval
 
     def remove_device_updater(self, device_id: DeviceID):
         if device_id in self.device_updaters:
             self.device_updaters[device_id][1]()
             del self.device_updaters[device_id]
 
-    def _refresh_updaters(self) -> None:
+    def _refresh_device_updater(self, device_id: DeviceID) -> None:
         """
-        Derive required updaters for devices and create new and/or cancel existing.
-        :return:
+        Derive required updater for device and create new and/or cancel existing.
+        :param device_id: Device ID
         """
-        for device_id, entities in self.device_entities.items():
-            update_commands = set([entity.command_update for entity in entities])
-            if device_id in self.device_updaters:
-                current_update_commands, canceler = self.device_updaters[device_id]
-                if not update_commands ^ current_update_commands:
-                    _LOGGER.debug(
-                        "Updater for device %s is fine, not cancelling" % device_id
-                    )
-                    continue
-                canceler()
-                del self.device_updaters[device_id]
+        device = self.devices.get(device_id)
+        if device is not None and device.connector is not None:
+            # devices added from cached listing have no connector until account syncs
+            update_commands = {
+                entity.command_update
+                for entity in self.device_entities.get(device_id, ())
+            }
+        else:
+            update_commands = set()
 
-            if update_commands:
+        if device_id in self.device_updaters:
+            current_update_commands, canceler = self.device_updaters[device_id]
+            if update_commands == current_update_commands:
                 _LOGGER.debug(
-                    'Creating updater for device with ID "%s" with commands: %s'
-                    % (device_id, ", ".join(update_commands))
+                    "Updater for device %s is fine, not cancelling" % device_id
                 )
-                device_cfg = self.devices_config_entries[device_id]
-                interval = device_cfg.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-                if isinstance(interval, int):
-                    interval = timedelta(seconds=interval)
-
-                self.device_updaters[device_id] = (
-                    update_commands,
-                    self._create_updater(
-                        device_id=device_id,
-                        commands=update_commands,
-                        interval=interval,
-                    ),
-                )
-            else:
-                _LOGGER.debug('No updater required for device with ID "%s"' % device_id)
-
-        _LOGGER.debug("Refreshed updaters: %s" % self.device_updaters)
+                return
+            canceler()
+            del self.device_updaters[device_id]
 
-    def _create_listener(self, connector: "_BaseConnector"):
-        from hekrapi.device import Listener
+        if update_commands:
+            _LOGGER.debug(
+                'Creating updater for device with ID "%s" with commands: %s'
+                % (device_id, ", ".join(update_commands))
+            )
+            self.device_updaters[device_id] = (
+                update_commands,
+                self._create_updater(
+                    device_id=device_id,
+                    commands=update_commands,
+                    interval=self.get_scan_interval(device_id),
+                ),
+            )
+        else:
+            _LOGGER.debug('No updater required for device with ID "%s"' % device_id)
 
-        return Listener(
+    def _create_listener(self, connector: "_BaseConnector") -> NativeListener:
+        return NativeListener(
+            self.hass,
             connector,
-            callback_exec_function=self.hass.add_job,
-            callback_task_function=self.hass.async_create_task,
-            auto_reconnect=True,
-        )
-
-    def _refresh_listeners(self):
-        required_device_ids = self.device_updaters.keys()
-        _LOGGER.debug("Required device IDs for listening: %s" % required_device_ids)
-        active_listeners = set()
-        required_listeners = set()
-        for device_id, device in self.devices.items():
-            if device_id in required_device_ids:
-                _LOGGER.debug(
-                    "Device ID %s is required, adding its listener" % device_id
-                )
-                listener = device.connector.get_listener(
-                    listener_factory=self._create_listener
-                )
-                required_listeners.add(listener)
-                if listener.is_running:
-                    _LOGGER.debug("Listener for device ID %s is active" % device_id)
-                    active_listeners.add(listener)
-                else:
-                    _LOGGER.debug("Listener for device ID %s is inactive" % device_id)
-            else:
-                listener = device.connector.listener
-                if listener is not None and listener.is_running:
-                    active_listeners.add(listener)
+            callback=self.callback_update_entities,
+            reconnect_delay=True,
+        )
 
-        for listener in active_listeners - required_listeners:
-            if listener.is_running:
-                listener.stop()
+    def _refresh_connector_listener(self, connector: "_BaseConnector") -> None:
+        """
+        Start or stop connector listener depending on whether any of the devices
+        attached to the connector are being updated and are not offline.
+        :param connector: Connector
+        """
+        is_required = any(
+            device_id in self.device_updaters and not self.is_device_offline(device_id)
+            for device_id in connector.devices
+        )
+        listener = connector.listener
 
-        for listener in required_listeners - active_listeners:
+        if is_required:
+            listener = connector.get_listener(listener_factory=self._create_listener)
             if not listener.is_running:
+                _LOGGER.debug("Starting listener for connector %s" % connector)
                 listener.start()
 
+        elif listener is not None and listener.is_running:
+            _LOGGER.debug("Stopping listener for connector %s" % connector)
+            listener.stop()
+
+    def schedule_refresh(self, device_id: DeviceID) -> None:
+        """
+        Schedule deferred reconciliation of device updater and listener. Refreshes
+        requested in a burst (e.g. during platform setup) are collapsed into one pass.
+        :param device_id: Device ID
+        """
+        self.pending_refreshes.add(device_id)
+        if self._refresh_handle is None:
+            self._refresh_handle = self.hass.loop.call_later(
+                DEFAULT_REFRESH_DELAY, self._run_pending_refreshes
+            )
+
+    def _run_pending_refreshes(self) -> None:
+        self._refresh_handle = None
+        pending_refreshes, self.pending_refreshes = self.pending_refreshes, set()
+
+        refreshed_connectors = set()
+        for device_id in pending_refreshes:
+            self._refresh_device_updater(device_id)
+
+            device = self.devices.get(device_id)
+            if device is not None and device.connector is not None:
+                refreshed_connectors.add(device.connector)
+
+        for connector in refreshed_connectors:
+            self._refresh_connector_listener(connector)
+
+        _LOGGER.debug("Refreshed connections for %d devices" % len(pending_refreshes))
+
     def refresh_connections(self):
-        # 1. Refresh updaters
-        self._refresh_updaters()
-        # 2. Refresh listeners
-        self._refresh_listeners()
+        """Reconcile updaters and listeners of all devices immediately."""
+        if self._refresh_handle is not None:
+            self._refresh_handle.cancel()
+        self.pending_refreshes.update(self.devices.keys(), self.device_updaters.keys())
+        self._run_pending_refreshes()
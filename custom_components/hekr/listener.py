@@ -0,0 +1,173 @@
+"""Native asyncio listener for Hekr connectors."""
+
+__all__ = (
+    "FrameCallback",
+    "FrameLatency",
+    "NativeListener",
+)
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, TYPE_CHECKING, Union
+
+from hekrapi import HekrAPIException
+
+from custom_components.hekr.transport import SharedLocalConnector
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from hekrapi import Device, DeviceResponseState, MessageID
+
+    # noinspection PyProtectedMember
+    from hekrapi.device import _BaseConnector
+
+_LOGGER = logging.getLogger(__name__)
+
+FrameCallback = Callable[
+    [
+        Optional["Device"],
+        "MessageID",
+        "DeviceResponseState",
+        str,
+        Any,
+        float,
+    ],
+    None,
+]
+
+
+@dataclass
+class FrameLatency:
+    """Latency between frame arrival and state writes caused by the frame."""
+
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+    last: float = 0.0
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def record(self, latency: float) -> None:
+        self.count += 1
+        self.total += latency
+        self.last = latency
+        if latency > self.maximum:
+            self.maximum = latency
+
+
+class NativeListener:
+    """
+    Listener delivering decoded frames straight into a callback on the event loop.
+
+    Datagrams routed to shared local connectors are decoded and dispatched from within
+    the endpoint's receive handler; other connectors are read by a single receive
+    loop. In both cases the callback runs synchronously, without scheduling a job or
+    a task per frame. Compatible with `hekrapi` listener interface, so connectors
+    can stop and restart it (e.g. on token updates).
+    """
+
+    def __init__(
+        self,
+        hass: "HomeAssistant",
+        connector: "_BaseConnector",
+        callback: FrameCallback,
+        reconnect_delay: Union[float, bool] = 1.0,
+    ):
+        self.hass = hass
+        self.connector = connector
+        self._callback = callback
+        self._reconnect_delay = reconnect_delay
+        self._running: Optional[asyncio.Task] = None
+
+    def __str__(self):
+        return "<Hekr:NativeListener(%s, %s)>" % (
+            "running" if self.is_running else "stopped",
+            self.connector,
+        )
+
+    @property
+    def is_running(self) -> bool:
+        return self._running is not None and not self._running.done()
+
+    def start(self, *_) -> None:
+        if self.is_running:
+            raise RuntimeError("Cannot start an already running listener")
+        _LOGGER.debug("Starting listener %s" % self)
+        self._running = self.hass.async_create_background_task(
+            self._receive(), name="hekr_listener_%s" % self.connector
+        )
+
+    def stop(self) -> None:
+        if self.is_running:
+            self._running.cancel()
+        self._running = None
+
+    async def _receive(self) -> None:
+        connector = self.connector
+        push_receiver = isinstance(connector, SharedLocalConnector)
+
+        while True:
+            try:
+                if not connector.is_connected:
+                    await connector.open_connection()
+
+                if push_receiver:
+                    connector.receiver = self.handle_response
+
+                while True:
+                    # shared local connectors only return from here once closed
+                    response = await connector.read_response()
+                    self.handle_response(response, self.hass.loop.time())
+
+            except asyncio.CancelledError:
+                _LOGGER.debug("Closing listener %s by cancel" % self)
+                raise
+
+            except (Exception, HekrAPIException) as e:
+                # hekrapi exceptions derive from `BaseException`
+                _LOGGER.debug("Listener %s lost connection: %s" % (self, e))
+                if connector.is_connected:
+                    try:
+                        await connector.close_connection()
+                    except (Exception, HekrAPIException):
+                        _LOGGER.debug("Could not close connector %s" % connector)
+
+                if not self._reconnect_delay:
+                    return
+
+                await asyncio.sleep(
+                    1.0 if self._reconnect_delay is True else self._reconnect_delay
+                )
+
+            finally:
+                if push_receiver and connector.receiver == self.handle_response:
+                    connector.receiver = None
+
+    def handle_response(self, response: Union[str, bytes], received_at: float) -> None:
+        """
+        Decode response and deliver it to callback.
+        :param response: Response payload
+        :param received_at: Loop time at which response arrived
+        """
+        if isinstance(response, bytes):
+            response = response.decode("utf-8").strip()
+
+        try:
+            message_id, state, action, data, device = self.connector.process_response(
+                response
+            )
+        except (Exception, HekrAPIException):
+            _LOGGER.exception(
+                "Could not process response on %s: %s" % (self.connector, response)
+            )
+            return
+
+        try:
+            self._callback(device, message_id, state, action, data, received_at)
+        except (Exception, HekrAPIException):
+            _LOGGER.exception(
+                "Exception occurred while dispatching response on %s" % self.connector
+            )
@@ -0,0 +1,140 @@
+"""Registry of protocols supported by Hekr devices."""
+
+__all__ = ("ProtocolRegistry",)
+
+from collections.abc import Mapping
+from typing import Any, Iterator, Optional, TYPE_CHECKING
+
+from custom_components.hekr.const import (
+    PROTOCOL_DEFINITION,
+    PROTOCOL_MODEL,
+    PROTOCOL_PRODUCT_NAMES,
+)
+
+if TYPE_CHECKING:
+    from hekrapi import Device
+    from hekrapi.protocol import Protocol
+
+
+class ProtocolRegistry(Mapping):
+    """
+    Protocol ID -> protocol mapping, indexed by protocol definition, product name
+    and model of supported devices.
+
+    Devices are matched to protocols through the indexes, so that matching a device
+    does not depend on the number of supported protocols. Only protocols declaring
+    no product names fall back to their definitions' compatibility checkers.
+    """
+
+    def __init__(self):
+        self._protocols: dict[str, dict[str, Any]] = {}
+        self._by_definition: dict["Protocol", str] = {}
+        self._by_product_name: dict[str, str] = {}
+        self._by_model: dict[str, str] = {}
+        self._unindexed: list[str] = []
+
+    def __getitem__(self, protocol_id: str) -> dict[str, Any]:
+        return self._protocols[protocol_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._protocols)
+
+    def __len__(self) -> int:
+        return len(self._protocols)
+
+    def register(self, protocol_id: str, protocol: dict[str, Any]) -> dict[str, Any]:
+        """
+        Register protocol.
+        :param protocol_id: Protocol ID
+        :param protocol: Protocol (as defined in `supported_protocols`)
+        :return: Registered protocol
+        """
+        if protocol_id in self._protocols:
+            raise ValueError('Protocol "%s" is already registered' % protocol_id)
+
+        definition = protocol[PROTOCOL_DEFINITION]
+        if definition in self._by_definition:
+            raise ValueError(
+                'Definition of protocol "%s" is already registered for protocol "%s"'
+                % (protocol_id, self._by_definition[definition])
+            )
+
+        self._protocols[protocol_id] = protocol
+        self._by_definition[definition] = protocol_id
+
+        product_names = protocol.get(PROTOCOL_PRODUCT_NAMES)
+        if product_names:
+            for product_name in product_names:
+                self._by_product_name.setdefault(product_name, protocol_id)
+        else:
+            self._unindexed.append(protocol_id)
+
+        model = protocol.get(PROTOCOL_MODEL)
+        if model:
+            self._by_model.setdefault(model.lower(), protocol_id)
+
+        return protocol
+
+    def get_protocol_id(self, definition: Optional["Protocol"]) -> Optional[str]:
+        """
+        Look up protocol ID by protocol definition.
+        :param definition: Protocol definition
+        :return: Protocol ID, `None` if definition is not registered
+        """
+        if definition is None:
+            return None
+        return self._by_definition.get(definition)
+
+    def get_protocol_id_by_product_name(self, product_name: str) -> Optional[str]:
+        """
+        Look up protocol ID by product name reported by the cloud.
+        :param product_name: Product name
+        :return: Protocol ID, `None` if product is not supported
+        """
+        return self._by_product_name.get(product_name)
+
+    def get_protocol_id_by_model(self, model: str) -> Optional[str]:
+        """
+        Look up protocol ID by device model (case-insensitive).
+        :param model: Device model
+        :return: Protocol ID, `None` if model is not supported
+        """
+        return self._by_model.get(model.lower())
+
+    def match_device(self, device: "Device") -> Optional[str]:
+        """
+        Match device to protocol by its protocol definition, or by product name or
+        model from its cloud info.
+        :param device: Device object
+        :return: Protocol ID, `None` if device does not match any protocol
+        """
+        protocol_id = self.get_protocol_id(device.protocol)
+        if protocol_id is not None:
+            return protocol_id
+
+        device_info = device.device_info
+        if not device_info:
+            return None
+
+        product_name = device_info.get("productName")
+        if isinstance(product_name, dict):
+            product_name = product_name.get("en_US")
+        if product_name:
+            protocol_id = self.get_protocol_id_by_product_name(product_name)
+            if protocol_id is not None:
+                return protocol_id
+
+        model = device_info.get("model")
+        if isinstance(model, str) and model:
+            protocol_id = self.get_protocol_id_by_model(model)
+            if protocol_id is not None:
+                return protocol_id
+
+        for protocol_id in self._unindexed:
+            checker = self._protocols[protocol_id][
+                PROTOCOL_DEFINITION
+            ].compatibility_checker
+            if checker is not None and checker(device):
+                return protocol_id
+
+        return None
@@ -0,0 +1,69 @@
+"""Round-trip time estimation for Hekr devices."""
+
+__all__ = ("RTTEstimator",)
+
+from typing import Optional
+
+# Smoothing factors and variance multiplier from RFC 6298
+RTT_ALPHA = 1 / 8
+RTT_BETA = 1 / 4
+RTT_VARIANCE_FACTOR = 4
+MAX_BACKOFF = 64
+
+
+class RTTEstimator:
+    """
+    Estimator of command round-trip times for a single device.
+
+    Follows the computation of TCP retransmission timeout: a smoothed RTT and its mean
+    deviation are updated on every measured response, and the timeout is derived from
+    both. Every timeout doubles the next derived value until a response is measured.
+    """
+
+    def __init__(self, min_timeout: float):
+        self.min_timeout = min_timeout
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.backoff = 1
+        self.samples = 0
+        self.timeouts = 0
+
+    def __str__(self):
+        if self.srtt is None:
+            return "<Hekr:RTTEstimator(no samples)>"
+        return "<Hekr:RTTEstimator(srtt %.1f ms, rttvar %.1f ms, backoff %d)>" % (
+            self.srtt * 1000,
+            self.rttvar * 1000,
+            self.backoff,
+        )
+
+    def add_sample(self, rtt: float) -> None:
+        """
+        Update estimate with measured round-trip time.
+        :param rtt: Round-trip time (in seconds)
+        """
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - RTT_BETA) * self.rttvar + RTT_BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - RTT_ALPHA) * self.srtt + RTT_ALPHA * rtt
+        self.backoff = 1
+        self.samples += 1
+
+    def add_timeout(self) -> None:
+        """Back off derived timeout after a response has not arrived in time."""
+        self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+        self.timeouts += 1
+
+    def get_timeout(self, max_timeout: float) -> float:
+        """
+        Derive response timeout from the estimate.
+        :param max_timeout: Configured timeout, also used while no samples exist
+        :return: Timeout (in seconds)
+        """
+        if self.srtt is None:
+            return max_timeout
+
+        timeout = max(self.min_timeout, self.srtt + RTT_VARIANCE_FACTOR * self.rttvar)
+        return min(timeout * self.backoff, max_timeout)
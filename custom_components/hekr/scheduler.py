@@ -0,0 +1,277 @@
+"""Fleet-wide polling scheduler for Hekr devices."""
+
+__all__ = (
+    "PollCallback",
+    "PollScheduler",
+    "PollStatistics",
+)
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import zlib
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from hekrapi import DeviceID
+
+_LOGGER = logging.getLogger(__name__)
+
+PollCallback = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class _PollEntry:
+    device_id: "DeviceID"
+    interval: float
+    action: PollCallback
+    anchor: float
+    due: float = 0.0
+    generation: int = 0
+    task: Optional[asyncio.Task] = None
+    lateness: float = 0.0
+    max_lateness: float = 0.0
+    runs: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class PollStatistics:
+    interval: float
+    next_due_in: float
+    lateness: float
+    max_lateness: float
+    runs: int
+    skipped: int
+    running: bool = False
+
+
+class PollScheduler:
+    """
+    Single timer owning poll schedules of every device.
+
+    Devices are kept in a heap ordered by their next due time, and only one loop timer
+    is armed at any moment (for the earliest due entry). Each device's phase within its
+    interval is derived from its ID, so schedules are spread deterministically across
+    restarts; a bounded random jitter is added on top of every slot. Polls run under a
+    shared concurrency limit, and the lateness of every slot is recorded.
+    """
+
+    def __init__(
+        self,
+        hass: "HomeAssistant",
+        concurrency: int,
+        jitter: float,
+        lateness_warning: float,
+    ):
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._jitter = jitter
+        self._lateness_warning = lateness_warning
+
+        self._entries: dict["DeviceID", _PollEntry] = {}
+        self._heap: list[tuple[float, int, "DeviceID", int]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at: Optional[float] = None
+        self._stopped = False
+
+    def __contains__(self, device_id: "DeviceID") -> bool:
+        return device_id in self._entries
+
+    # Schedule management
+    def add(
+        self, device_id: "DeviceID", interval: timedelta, action: PollCallback
+    ) -> Callable[[], None]:
+        """
+        Add (or replace) poll schedule for device.
+        :param device_id: Device ID to poll
+        :param interval: Interval with which to poll
+        :param action: Coroutine function to call on every slot
+        :return: Schedule cancel function
+        """
+        self.remove(device_id)
+
+        interval_seconds = interval.total_seconds()
+        phase = (zlib.crc32(device_id.encode()) / 0xFFFFFFFF) * interval_seconds
+
+        entry = _PollEntry(
+            device_id=device_id,
+            interval=interval_seconds,
+            action=action,
+            anchor=self.hass.loop.time() + phase,
+        )
+        self._entries[device_id] = entry
+        self._push(entry, entry.anchor + self._get_jitter(entry))
+
+        _LOGGER.debug(
+            'Scheduled polling for device "%s" every %.1f seconds (phase %.2f seconds)'
+            % (device_id, interval_seconds, phase)
+        )
+
+        return lambda: self._remove_entry(entry)
+
+    def remove(self, device_id: "DeviceID") -> None:
+        """
+        Remove poll schedule for device.
+        :param device_id: Device ID
+        """
+        entry = self._entries.get(device_id)
+        if entry is not None:
+            self._remove_entry(entry)
+
+    def reschedule(self, device_id: "DeviceID", delay: float) -> None:
+        """
+        Move next poll slot of the device to given delay from now.
+        Subsequent slots follow from the new position.
+        :param device_id: Device ID
+        :param delay: Delay in seconds
+        """
+        entry = self._entries.get(device_id)
+        if entry is None:
+            return
+
+        entry.anchor = self.hass.loop.time() + max(delay, 0.0)
+        self._push(entry, entry.anchor + self._get_jitter(entry))
+
+    def stop(self) -> None:
+        """Cancel timer and all running polls."""
+        self._stopped = True
+        self._cancel_timer()
+        for entry in self._entries.values():
+            if entry.task is not None and not entry.task.done():
+                entry.task.cancel()
+        self._entries.clear()
+        self._heap.clear()
+
+    def get_statistics(self) -> dict["DeviceID", PollStatistics]:
+        """
+        Retrieve per-device scheduling statistics.
+        :return: Device ID -> statistics
+        """
+        loop_time = self.hass.loop.time()
+        return {
+            device_id: PollStatistics(
+                interval=entry.interval,
+                next_due_in=entry.due - loop_time,
+                lateness=entry.lateness,
+                max_lateness=entry.max_lateness,
+                runs=entry.runs,
+                skipped=entry.skipped,
+                running=entry.task is not None and not entry.task.done(),
+            )
+            for device_id, entry in self._entries.items()
+        }
+
+    # Internal heap and timer handling
+    def _get_jitter(self, entry: _PollEntry) -> float:
+        return random.uniform(0.0, self._jitter * entry.interval)
+
+    def _remove_entry(self, entry: _PollEntry) -> None:
+        if self._entries.get(entry.device_id) is not entry:
+            return
+
+        del self._entries[entry.device_id]
+        # heap items are discarded lazily on pop
+        entry.generation += 1
+
+        if not self._entries:
+            self._heap.clear()
+            self._cancel_timer()
+
+    def _push(self, entry: _PollEntry, due: float, arm_timer: bool = True) -> None:
+        entry.generation += 1
+        entry.due = due
+        heapq.heappush(
+            self._heap, (due, next(self._sequence), entry.device_id, entry.generation)
+        )
+        if arm_timer:
+            self._arm_timer()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._timer_at = None
+
+    def _arm_timer(self) -> None:
+        if self._stopped or not self._heap:
+            return
+
+        when = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer_at <= when:
+                return
+            self._timer.cancel()
+
+        self._timer_at = when
+        self._timer = self.hass.loop.call_at(when, self._run_due)
+
+    def _run_due(self) -> None:
+        self._timer = None
+        self._timer_at = None
+
+        loop_time = self.hass.loop.time()
+        heap = self._heap
+
+        while heap and heap[0][0] <= loop_time:
+            due, _, device_id, generation = heapq.heappop(heap)
+            entry = self._entries.get(device_id)
+            if entry is None or entry.generation != generation:
+                # stale heap item (removed or rescheduled entry)
+                continue
+
+            # advance anchor past current time, counting slots missed entirely
+            entry.anchor += entry.interval
+            while entry.anchor <= loop_time:
+                entry.anchor += entry.interval
+                entry.skipped += 1
+
+            if entry.task is not None and not entry.task.done():
+                _LOGGER.debug(
+                    'Previous poll for device "%s" is still running, skipping slot'
+                    % device_id
+                )
+                entry.skipped += 1
+            else:
+                entry.task = self.hass.async_create_background_task(
+                    self._run_entry(entry, due),
+                    name="hekr_poll_" + device_id,
+                )
+
+            self._push(entry, entry.anchor + self._get_jitter(entry), arm_timer=False)
+
+        self._arm_timer()
+
+    async def _run_entry(self, entry: _PollEntry, due: float) -> None:
+        async with self._semaphore:
+            lateness = self.hass.loop.time() - due
+            entry.lateness = lateness
+            entry.runs += 1
+            if lateness > entry.max_lateness:
+                entry.max_lateness = lateness
+
+            if lateness > self._lateness_warning:
+                _LOGGER.warning(
+                    'Poll slot for device "%s" is running %.2f seconds late'
+                    % (entry.device_id, lateness)
+                )
+            else:
+                _LOGGER.debug(
+                    'Poll slot for device "%s" is running %.3f seconds late'
+                    % (entry.device_id, lateness)
+                )
+
+            try:
+                await entry.action()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                _LOGGER.exception(
+                    'Exception occurred while polling device "%s"' % entry.device_id
+                )
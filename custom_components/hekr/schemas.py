@@ -6,6 +6,7 @@ __all__ = [
     "BASE_VALIDATOR_DOMAINS",
     "CONFIG_SCHEMA",
     "CUSTOMIZE_SCHEMA",
+    "ENTITY_CUSTOMIZE_SCHEMA",
     "test_for_list_correspondence",
 ]
 
@@ -35,10 +36,22 @@ from .const import (
     CONF_DEVICES,
     CONF_USE_MODEL_FROM_PROTOCOL,
     DEFAULT_USE_MODEL_FROM_PROTOCOL,
+    CONF_STARTUP_CONCURRENCY,
+    DEFAULT_STARTUP_CONCURRENCY,
     CONF_DOMAINS,
     CONF_ACCOUNTS,
     CONF_DUMP_DEVICE_CREDENTIALS,
     CONF_TOKEN_UPDATE_INTERVAL,
+    CONF_SYNC_INTERVAL,
+    CONF_DETECT_PROTOCOLS,
+    DEFAULT_ACCOUNT_SYNC_INTERVAL,
+    CONF_PUSH_AWARE_POLLING,
+    DEFAULT_PUSH_AWARE_POLLING,
+    PROTOCOL_DEADBAND,
+    PROTOCOL_DEADBAND_RELATIVE,
+    PROTOCOL_MIN_INTERVAL,
+    PROTOCOL_MAX_AGE,
+    PROTOCOL_AUTO,
 )
 from .supported_protocols import SUPPORTED_PROTOCOLS
 
@@ -48,6 +61,9 @@ def test_for_list_correspondence(config_key: str, protocol_key: str):
         param_val = values.get(config_key)
         if param_val is None or isinstance(param_val, bool):
             return values
+        if values.get(CONF_PROTOCOL) == PROTOCOL_AUTO:
+            # entity types are checked against protocol once it is detected
+            return values
         avail_val = set(
             SUPPORTED_PROTOCOLS[values.get(CONF_PROTOCOL)][protocol_key].keys()
         )
@@ -62,6 +78,17 @@ def test_for_list_correspondence(config_key: str, protocol_key: str):
     return validator
 
 
+ENTITY_CUSTOMIZE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(PROTOCOL_DEADBAND): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(PROTOCOL_DEADBAND_RELATIVE): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=100)
+        ),
+        vol.Optional(PROTOCOL_MIN_INTERVAL): cv.time_period,
+        vol.Optional(PROTOCOL_MAX_AGE): cv.time_period,
+    }
+)
+
 BASE_DEVICE_SCHEMA = {
     vol.Optional(CONF_NAME): cv.string,
     vol.Optional(CONF_SENSORS): vol.Any(bool, vol.All(cv.ensure_list, [cv.string])),
@@ -69,6 +96,10 @@ BASE_DEVICE_SCHEMA = {
     vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(
         cv.time_period, cv.positive_timedelta
     ),
+    vol.Optional(
+        CONF_PUSH_AWARE_POLLING, default=DEFAULT_PUSH_AWARE_POLLING
+    ): cv.boolean,
+    vol.Optional(CONF_CUSTOMIZE): {cv.string: ENTITY_CUSTOMIZE_SCHEMA},
 }
 
 CUSTOMIZE_SCHEMA = vol.Any(
@@ -100,7 +131,15 @@ BASE_PLATFORM_SCHEMA = {
     ),
 }
 
-DEVICE_SCHEMA = vol.All(BASE_PLATFORM_SCHEMA, *BASE_VALIDATOR_DOMAINS)
+DEVICE_SCHEMA = vol.All(
+    {
+        **BASE_PLATFORM_SCHEMA,
+        vol.Required(CONF_PROTOCOL): vol.Any(
+            PROTOCOL_AUTO, vol.In(SUPPORTED_PROTOCOLS.keys())
+        ),
+    },
+    *BASE_VALIDATOR_DOMAINS,
+)
 
 ACCOUNT_SCHEMA = {
     vol.Required(CONF_USERNAME): cv.string,
@@ -111,9 +150,13 @@ ACCOUNT_SCHEMA = {
         cv.time_period, cv.positive_timedelta
     ),
     vol.Optional(CONF_TOKEN_UPDATE_INTERVAL): cv.time_period,
+    vol.Optional(CONF_SYNC_INTERVAL, default=DEFAULT_ACCOUNT_SYNC_INTERVAL): vol.All(
+        cv.time_period, cv.positive_timedelta
+    ),
     vol.Optional(CONF_TIMEOUT, default=5.0): vol.All(
         vol.Coerce(float), vol.Range(min=0)
     ),
+    vol.Optional(CONF_DETECT_PROTOCOLS, default=False): cv.boolean,
 }
 
 CONFIG_SCHEMA = vol.Schema(
@@ -122,6 +165,9 @@ CONFIG_SCHEMA = vol.Schema(
             vol.Optional(
                 CONF_USE_MODEL_FROM_PROTOCOL, default=DEFAULT_USE_MODEL_FROM_PROTOCOL
             ): cv.boolean,
+            vol.Optional(
+                CONF_STARTUP_CONCURRENCY, default=DEFAULT_STARTUP_CONCURRENCY
+            ): cv.positive_int,
             vol.Optional(CONF_DEVICES): vol.All(cv.ensure_list, [DEVICE_SCHEMA]),
             vol.Optional(CONF_ACCOUNTS): vol.All(cv.ensure_list, [ACCOUNT_SCHEMA]),
             vol.Optional(CONF_CUSTOMIZE): {cv.string: CUSTOMIZE_SCHEMA},
@@ -0,0 +1,163 @@
+"""Startup orchestration for Hekr devices and accounts."""
+
+__all__ = (
+    "STAGE_AUTHENTICATE",
+    "STAGE_CONNECT",
+    "STAGE_CONNECT_CLOUD",
+    "STAGE_DETECT_PROTOCOL",
+    "STAGE_LIST_DEVICES",
+    "StageTiming",
+    "StartupOrchestrator",
+)
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Coroutine, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+STAGE_CONNECT = "connect"
+STAGE_AUTHENTICATE = "authenticate"
+STAGE_LIST_DEVICES = "list_devices"
+STAGE_CONNECT_CLOUD = "connect_cloud"
+STAGE_DETECT_PROTOCOL = "detect_protocol"
+
+
+@dataclass
+class StageTiming:
+    jobs: int = 0
+    failed: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def wall(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    def __str__(self):
+        return "%d jobs (%d failed), %.3f s wall, %.3f s longest" % (
+            self.jobs,
+            self.failed,
+            self.wall,
+            self.maximum,
+        )
+
+
+class StartupOrchestrator:
+    """
+    Runner of startup jobs (connection opening, account authentication and device
+    listing) under a shared concurrency limit.
+
+    Jobs either run in the caller's context, when their result is required to proceed
+    with setup, or in the background. Time spent on every job is accounted for per
+    stage, and the breakdown is logged every time the orchestrator becomes idle.
+    """
+
+    def __init__(self, hass: "HomeAssistant", concurrency: int):
+        self.hass = hass
+        self.concurrency = concurrency
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stages: dict[str, StageTiming] = {}
+        self._background: set[asyncio.Task] = set()
+        self._active = 0
+        self._started_at: Optional[float] = None
+
+    def __len__(self):
+        return self._active
+
+    async def run(self, stage: str, job: Coroutine) -> Any:
+        """
+        Run job under concurrency limit and wait for its result.
+        :param stage: Stage name
+        :param job: Coroutine to run; it fails by raising an exception or returning
+                    `False`
+        :return: Result of the job
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        loop = self.hass.loop
+        if not self._active:
+            self._started_at = loop.time()
+        self._active += 1
+
+        timing = self._stages.setdefault(stage, StageTiming())
+        try:
+            async with self._semaphore:
+                started_at = loop.time()
+                if timing.started_at is None:
+                    timing.started_at = started_at
+                timing.jobs += 1
+                try:
+                    result = await job
+                except BaseException:
+                    timing.failed += 1
+                    raise
+                else:
+                    if result is False:
+                        timing.failed += 1
+                    return result
+                finally:
+                    duration = loop.time() - started_at
+                    timing.total += duration
+                    timing.finished_at = loop.time()
+                    if duration > timing.maximum:
+                        timing.maximum = duration
+        finally:
+            # job might have been cancelled before starting
+            job.close()
+            self._active -= 1
+            if not self._active:
+                self._log_summary()
+
+    def schedule(self, stage: str, name: str, job: Coroutine) -> asyncio.Task:
+        """
+        Run job under concurrency limit in the background.
+        :param stage: Stage name
+        :param name: Job name (e.g. device ID)
+        :param job: Coroutine to run; it must handle its own errors, and may report
+                    failure by returning `False`
+        :return: Background task
+        """
+        task = self.hass.async_create_background_task(
+            self.run(stage, job), name="hekr_%s_%s" % (stage, name)
+        )
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    def cancel(self) -> None:
+        """Cancel jobs running in the background."""
+        for task in self._background:
+            task.cancel()
+        self._background.clear()
+
+    def get_statistics(self) -> dict[str, StageTiming]:
+        """
+        Retrieve per-stage timings.
+        :return: Stage name -> timing
+        """
+        return dict(self._stages)
+
+    def _log_summary(self) -> None:
+        if not self._stages:
+            return
+
+        _LOGGER.debug(
+            "Startup jobs finished in %.3f seconds: %s"
+            % (
+                self.hass.loop.time() - self._started_at,
+                "; ".join(
+                    "%s: %s" % (stage, timing) for stage, timing in self._stages.items()
+                ),
+            )
+        )
@@ -5,6 +5,8 @@ __all__ = [
     "POWER_METER",
 ]
 
+from datetime import timedelta
+
 from hekrapi.protocols.power_meter import (
     CurrentWarning,
     PROTOCOL as PROTOCOL_POWER_METER,
@@ -42,16 +44,22 @@ from .const import (
     PROTOCOL_CMD_TURN_OFF,
     PROTOCOL_CMD_TURN_ON,
     PROTOCOL_CMD_UPDATE,
+    PROTOCOL_DEADBAND,
+    PROTOCOL_DEADBAND_RELATIVE,
     PROTOCOL_DEFAULT,
     PROTOCOL_DEFINITION,
     PROTOCOL_FILTER,
     PROTOCOL_MANUFACTURER,
+    PROTOCOL_MAX_AGE,
     PROTOCOL_MODEL,
     PROTOCOL_NAME,
     PROTOCOL_PORT,
+    PROTOCOL_PROBE_COMMAND,
+    PROTOCOL_PRODUCT_NAMES,
     PROTOCOL_SENSORS,
     PROTOCOL_SWITCHES,
 )
+from .protocol_registry import ProtocolRegistry
 
 
 def power_meter_attribute_filter(attributes: dict) -> dict:
@@ -120,12 +128,17 @@ def power_meter_attribute_filter(attributes: dict) -> dict:
     return attributes
 
 
+DEFAULT_MEASUREMENT_MAX_AGE = timedelta(minutes=5)
+
+
 # Predefined protocol support
 POWER_METER = {
     PROTOCOL_NAME: "Power Meter",
     PROTOCOL_MODEL: "DDS238-4 W",
     PROTOCOL_MANUFACTURER: "HIKING (TOMZN)",
+    PROTOCOL_PRODUCT_NAMES: ("Smart Meter",),
     PROTOCOL_PORT: 10000,
+    PROTOCOL_PROBE_COMMAND: "queryDev",
     PROTOCOL_DEFINITION: PROTOCOL_POWER_METER,
     PROTOCOL_FILTER: power_meter_attribute_filter,
     PROTOCOL_SENSORS: {
@@ -173,6 +186,8 @@ POWER_METER = {
             ATTR_UNIT_OF_MEASUREMENT: UnitOfPower.WATT,
             ATTR_DEVICE_CLASS: SensorDeviceClass.POWER,
             ATTR_STATE_CLASS: SensorStateClass.MEASUREMENT,
+            PROTOCOL_DEADBAND_RELATIVE: 1.0,
+            PROTOCOL_MAX_AGE: DEFAULT_MEASUREMENT_MAX_AGE,
             PROTOCOL_CMD_UPDATE: "queryDev",
             PROTOCOL_CMD_RECEIVE: "reportDev",
             PROTOCOL_DEFAULT: True,
@@ -202,6 +217,8 @@ POWER_METER = {
                 "voltage_3",
                 "current_frequency",
             ],
+            PROTOCOL_DEADBAND: 0.5,
+            PROTOCOL_MAX_AGE: DEFAULT_MEASUREMENT_MAX_AGE,
             PROTOCOL_CMD_UPDATE: "queryData",
             PROTOCOL_CMD_RECEIVE: "reportData",
             PROTOCOL_DEFAULT: False,
@@ -220,6 +237,8 @@ POWER_METER = {
                 "current_3",
                 "current_frequency",
             ],
+            PROTOCOL_DEADBAND: 0.05,
+            PROTOCOL_MAX_AGE: DEFAULT_MEASUREMENT_MAX_AGE,
             PROTOCOL_CMD_UPDATE: "queryData",
             PROTOCOL_CMD_RECEIVE: "reportData",
             PROTOCOL_DEFAULT: False,
@@ -232,6 +251,8 @@ POWER_METER = {
             ATTR_DEVICE_CLASS: SensorDeviceClass.POWER_FACTOR,
             ATTR_STATE_CLASS: SensorStateClass.MEASUREMENT,
             ATTR_MONITORED: ["power_factor_1", "power_factor_2", "power_factor_3"],
+            PROTOCOL_DEADBAND: 0.01,
+            PROTOCOL_MAX_AGE: DEFAULT_MEASUREMENT_MAX_AGE,
             PROTOCOL_CMD_UPDATE: "queryData",
             PROTOCOL_CMD_RECEIVE: "reportData",
             PROTOCOL_DEFAULT: False,
@@ -244,6 +265,8 @@ POWER_METER = {
             ATTR_DEVICE_CLASS: SensorDeviceClass.POWER,
             ATTR_STATE_CLASS: SensorStateClass.MEASUREMENT,
             ATTR_MONITORED: ["active_power_1", "active_power_2", "active_power_3"],
+            PROTOCOL_DEADBAND_RELATIVE: 1.0,
+            PROTOCOL_MAX_AGE: DEFAULT_MEASUREMENT_MAX_AGE,
             PROTOCOL_CMD_UPDATE: "queryData",
             PROTOCOL_CMD_RECEIVE: "reportData",
             PROTOCOL_DEFAULT: False,
@@ -259,6 +282,8 @@ POWER_METER = {
                 "reactive_power_2",
                 "reactive_power_3",
             ],
+            PROTOCOL_DEADBAND_RELATIVE: 1.0,
+            PROTOCOL_MAX_AGE: DEFAULT_MEASUREMENT_MAX_AGE,
             PROTOCOL_CMD_UPDATE: "queryData",
             PROTOCOL_CMD_RECEIVE: "reportData",
             PROTOCOL_DEFAULT: False,
@@ -292,7 +317,9 @@ def power_socket_attribute_filter(attributes: dict) -> dict:
 
 POWER_SOCKET = {
     PROTOCOL_NAME: "Power Socket",
+    PROTOCOL_PRODUCT_NAMES: ("Socket",),
     PROTOCOL_PORT: 10000,
+    PROTOCOL_PROBE_COMMAND: "Quary",
     PROTOCOL_DEFINITION: PROTOCOL_POWER_SOCKET,
     PROTOCOL_FILTER: power_socket_attribute_filter,
     PROTOCOL_SWITCHES: {
@@ -313,7 +340,6 @@ POWER_SOCKET = {
     },
 }
 
-SUPPORTED_PROTOCOLS = {
-    "power_meter": POWER_METER,
-    "power_socket": POWER_SOCKET,
-}
+SUPPORTED_PROTOCOLS = ProtocolRegistry()
+SUPPORTED_PROTOCOLS.register("power_meter", POWER_METER)
+SUPPORTED_PROTOCOLS.register("power_socket", POWER_SOCKET)
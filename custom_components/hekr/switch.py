@@ -8,33 +8,76 @@ __all__ = [
 ]
 
 import logging
-from typing import Any, Optional
+from typing import Any, Optional, TYPE_CHECKING
 
 from homeassistant.components.switch import PLATFORM_SCHEMA, DOMAIN as PLATFORM_DOMAIN
 from homeassistant.const import STATE_ON, STATE_OFF
+from homeassistant.core import callback
 
 from homeassistant.components.switch import SwitchEntity
+from hekrapi import DeviceResponseState, HekrAPIException
 
 from .base_platform import HekrEntity, create_platform_basics
 from .const import PROTOCOL_CMD_TURN_ON, PROTOCOL_CMD_TURN_OFF
 
+if TYPE_CHECKING:
+    from hekrapi import CommandData
+
 _LOGGER = logging.getLogger(__name__)
 
 
 class HekrSwitch(HekrEntity, SwitchEntity):
+    _confirmed_state: Optional[str] = None
+
     @property
     def is_on(self) -> bool:
         return self.state == STATE_ON
 
-    def turn_on(self, **kwargs: Any) -> None:
-        self._state = STATE_ON
-        self.execute_protocol_command(PROTOCOL_CMD_TURN_ON)
-        self.schedule_update_ha_state()
+    @callback
+    def handle_data_update(self, data: "CommandData") -> bool:
+        write_required = super().handle_data_update(data)
+        if not self._write_pending:
+            self._confirmed_state = self._state
+        return write_required
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        await self._async_switch(STATE_ON, PROTOCOL_CMD_TURN_ON)
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        await self._async_switch(STATE_OFF, PROTOCOL_CMD_TURN_OFF)
+
+    async def _async_switch(self, state: str, protocol_command: str) -> None:
+        """
+        Switch state optimistically, reverting it to the state last reported by
+        device when command fails.
+        :param state: Target state
+        :param protocol_command: Protocol command switching to the state
+        """
+        self.async_write_local_state(state)
+
+        try:
+            result = await self.async_execute_protocol_command(
+                protocol_command, replace_key=self.unique_id
+            )
+        except (Exception, HekrAPIException):
+            self._async_revert_state(state)
+            raise
+
+        # response data (if any) has already been applied to the entity
+        if result in (None, False, DeviceResponseState.FAILURE):
+            self._async_revert_state(state)
+
+    @callback
+    def _async_revert_state(self, state: str) -> None:
+        # state may have been switched again, or reported by device, in the meantime
+        if self._state != state:
+            return
 
-    def turn_off(self, **kwargs: Any) -> None:
-        self._state = STATE_OFF
-        self.execute_protocol_command(PROTOCOL_CMD_TURN_OFF)
-        self.schedule_update_ha_state()
+        _LOGGER.warning(
+            "Could not switch %s to %s, reverting to state %s reported by device"
+            % (self.entity_id, state, self._confirmed_state)
+        )
+        self.async_write_local_state(self._confirmed_state)
 
     @property
     def unique_id(self) -> Optional[str]:
@@ -0,0 +1,275 @@
+"""Access token lifecycle of Hekr accounts."""
+
+__all__ = (
+    "HekrAccount",
+    "TokenRefreshManager",
+)
+
+import asyncio
+import logging
+import random
+from datetime import timedelta
+from functools import partial
+from json import loads
+from typing import Callable, Optional, TYPE_CHECKING
+
+from aiohttp import ClientError, ClientSession
+from hekrapi import HekrAPIException
+from hekrapi.account import Account
+from hekrapi.exceptions import (
+    AuthenticationFailedException,
+    HekrResponseStatusError,
+    HekrValueError,
+    RefreshTokenExpiredException,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_BACKOFF_EXPONENT = 16
+
+# client error statuses not rejecting the refresh token itself
+TRANSIENT_CLIENT_STATUSES = (408, 429)
+
+
+class HekrAccount(Account):
+    """
+    Account which keeps cloud connections open when its token changes. Tokens only
+    authenticate cloud connections while they are being opened, so connectors take
+    the new token for their next connection, and their listeners keep running.
+    """
+
+    async def update_connectors(self, graceful: bool = False):
+        await super().update_connectors(graceful=graceful)
+
+    @classmethod
+    async def refresh_authentication_token(
+        cls, refresh_token: str, expires_in: int = 86400
+    ) -> dict:
+        # upstream maps only HTTP 403 to an authentication failure; refresh tokens
+        # are rejected with other client error statuses as well, while server errors
+        # must not be taken for rejections
+        url = cls.BASE_AUTH_URL + "/token/refresh"
+        payload = {
+            "refresh_token": refresh_token,
+            "expires_in": expires_in,
+        }
+
+        async with ClientSession() as session:
+            async with session.post(url, json=payload) as response:
+                content = await response.read()
+                status = response.status
+
+        if 400 <= status < 500 and status not in TRANSIENT_CLIENT_STATUSES:
+            raise AuthenticationFailedException(
+                "refresh token rejected with status %d" % status
+            )
+        if status != 200:
+            raise HekrResponseStatusError(url, got=status, expected=200)
+
+        return loads(content)
+
+    async def refresh_authentication(self, expires_in: int = 86400) -> None:
+        # upstream compares expiry against naive local time, while expiry itself is
+        # derived from `current_time`
+        refresh_token = self._Account__refresh_token
+        if refresh_token is None:
+            raise HekrValueError("refresh_token", "None", "refresh token")
+
+        expires_at = self.refresh_token_expires_at
+        if expires_at is not None and expires_at <= self.current_time():
+            raise RefreshTokenExpiredException()
+
+        response = await self.refresh_authentication_token(
+            refresh_token, expires_in=expires_in
+        )
+        _LOGGER.info("Successful token refresh for account %s" % self)
+        self._process_auth_response(response)
+
+        await self.update_connectors()
+
+
+class TokenRefreshManager:
+    """
+    Scheduler of access token refreshes for all accounts.
+
+    Refreshes are planned ahead of token expiry, at a random point within a window,
+    so that accounts authenticated together do not refresh together. Only one refresh
+    per account is in flight at any time: callers requesting a refresh while one is
+    running wait for its outcome. Refreshes rejected by the cloud fall back to a full
+    login, and failed ones are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        hass: "HomeAssistant",
+        refresh_lead: float,
+        refresh_spread: float,
+        backoff_min: float,
+        backoff_max: float,
+    ):
+        self.hass = hass
+        self.refresh_lead = refresh_lead
+        self.refresh_spread = refresh_spread
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+
+        self._accounts: dict[str, HekrAccount] = {}
+        self._intervals: dict[str, Optional[timedelta]] = {}
+        self._timers: dict[str, Callable] = {}
+        self._refreshes: dict[str, asyncio.Task] = {}
+        self._failures: dict[str, int] = {}
+
+    def __contains__(self, account_id: str) -> bool:
+        return account_id in self._accounts
+
+    def add(
+        self,
+        account_id: str,
+        account: HekrAccount,
+        update_interval: Optional[timedelta] = None,
+    ) -> None:
+        """
+        Start managing token of authenticated account.
+        :param account_id: Account ID (username)
+        :param account: Account object
+        :param update_interval: (optional) Interval to refresh token with regardless
+                                of its expiry
+        """
+        self._accounts[account_id] = account
+        self._intervals[account_id] = update_interval
+        self._failures.pop(account_id, None)
+        self._schedule(account_id, self.get_refresh_delay(account_id))
+
+    def remove(self, account_id: str) -> None:
+        """
+        Stop managing token of account.
+        :param account_id: Account ID (username)
+        """
+        self._cancel_timer(account_id)
+        refresh_task = self._refreshes.pop(account_id, None)
+        if refresh_task is not None:
+            refresh_task.cancel()
+
+        self._accounts.pop(account_id, None)
+        self._intervals.pop(account_id, None)
+        self._failures.pop(account_id, None)
+
+    def stop(self) -> None:
+        """Stop managing tokens of all accounts."""
+        for account_id in list(self._accounts):
+            self.remove(account_id)
+
+    async def async_refresh(self, account_id: str) -> bool:
+        """
+        Refresh token of account, joining refresh already in flight.
+        :param account_id: Account ID (username)
+        :return: Token has been refreshed
+        """
+        refresh_task = self._refreshes.get(account_id)
+        if refresh_task is None:
+            refresh_task = self._start_refresh(account_id)
+        return await asyncio.shield(refresh_task)
+
+    def get_refresh_delay(self, account_id: str) -> float:
+        """
+        Derive delay before token of account is refreshed.
+        :param account_id: Account ID (username)
+        :return: Delay (in seconds)
+        """
+        account = self._accounts[account_id]
+
+        due_in = None
+        expires_at = account.access_token_expires_at
+        if expires_at is not None:
+            due_in = (
+                expires_at - account.current_time()
+            ).total_seconds() - self.refresh_lead
+
+        interval = self._intervals.get(account_id)
+        if interval is not None:
+            interval = interval.total_seconds()
+            due_in = interval if due_in is None else min(due_in, interval)
+
+        if due_in is None or due_in <= 0:
+            return 0.0
+
+        return due_in - random.uniform(0.0, min(self.refresh_spread, due_in / 2))
+
+    def get_retry_delay(self, failures: int) -> float:
+        """
+        Derive delay before failed refresh is retried.
+        :param failures: Consecutive failed refreshes
+        :return: Delay (in seconds)
+        """
+        exponent = min(max(failures - 1, 0), MAX_BACKOFF_EXPONENT)
+        delay = min(self.backoff_min * 2**exponent, self.backoff_max)
+        return delay / 2 + random.uniform(0.0, delay / 2)
+
+    def _start_refresh(self, account_id: str) -> asyncio.Task:
+        refresh_task = self.hass.async_create_background_task(
+            self._refresh(account_id), name="hekr_token_" + account_id
+        )
+        self._refreshes[account_id] = refresh_task
+        refresh_task.add_done_callback(partial(self._finish_refresh, account_id))
+        return refresh_task
+
+    @callback
+    def _finish_refresh(self, account_id: str, refresh_task: asyncio.Task) -> None:
+        if self._refreshes.get(account_id) is refresh_task:
+            del self._refreshes[account_id]
+
+    async def _refresh(self, account_id: str) -> bool:
+        account = self._accounts[account_id]
+        self._cancel_timer(account_id)
+
+        _LOGGER.debug("Refreshing token of account %s" % account_id)
+        try:
+            try:
+                await account.refresh_authentication()
+            except (AuthenticationFailedException, HekrValueError) as e:
+                _LOGGER.info(
+                    "Token of account %s could not be refreshed (%s), logging in again"
+                    % (account_id, e)
+                )
+                await account.authenticate(attempt_refresh=False)
+
+        except (HekrAPIException, ClientError, OSError, TimeoutError) as e:
+            failures = self._failures.get(account_id, 0) + 1
+            self._failures[account_id] = failures
+            delay = self.get_retry_delay(failures)
+            _LOGGER.warning(
+                "Could not refresh token of account %s, retrying in %.0f seconds: %s"
+                % (account_id, delay, e)
+            )
+            self._schedule(account_id, delay)
+            return False
+
+        self._failures.pop(account_id, None)
+        self._schedule(account_id, self.get_refresh_delay(account_id))
+        return True
+
+    def _schedule(self, account_id: str, delay: float) -> None:
+        self._cancel_timer(account_id)
+        self._timers[account_id] = async_call_later(
+            self.hass, delay, partial(self._run_scheduled_refresh, account_id)
+        )
+        _LOGGER.debug(
+            "Next token refresh for account %s scheduled in %.0f seconds"
+            % (account_id, delay)
+        )
+
+    def _cancel_timer(self, account_id: str) -> None:
+        timer_canceller = self._timers.pop(account_id, None)
+        if timer_canceller is not None:
+            timer_canceller()
+
+    @callback
+    def _run_scheduled_refresh(self, account_id: str, *_) -> None:
+        self._timers.pop(account_id, None)
+        if account_id in self._accounts and account_id not in self._refreshes:
+            self._start_refresh(account_id)
@@ -0,0 +1,292 @@
+"""Shared UDP transport for Hekr devices reachable over LAN."""
+
+__all__ = (
+    "SharedLocalConnector",
+    "SharedUDPEndpoint",
+    "UDPEndpointPool",
+)
+
+import asyncio
+import logging
+import socket
+from json import loads
+from typing import Callable, Optional
+
+from hekrapi import (
+    ACTION_DEVICE_AUTH_REQUEST,
+    DEFAULT_APPLICATION_ID,
+    DEFAULT_TIMEOUT,
+    Device,
+    DeviceID,
+    HekrAPIException,
+    LocalConnector,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+Address = tuple[str, int]
+EndpointKey = tuple[int, int]
+
+
+def _get_device_id(data: bytes) -> Optional[DeviceID]:
+    try:
+        params = loads(data).get("params")
+    except (ValueError, AttributeError):
+        return None
+    return params.get("devTid") if isinstance(params, dict) else None
+
+
+class SharedUDPEndpoint(asyncio.DatagramProtocol):
+    """
+    Single datagram socket serving every local connector talking to a device port.
+
+    Incoming datagrams are demultiplexed to connectors by their source address. When
+    several connectors share an address (or a datagram arrives from an unknown one),
+    the device ID contained within the frame is used instead.
+    """
+
+    def __init__(self, pool: "UDPEndpointPool", key: EndpointKey):
+        self._pool = pool
+        self.key = key
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+        self._address_connectors: dict[Address, list["SharedLocalConnector"]] = {}
+        self._device_connectors: dict[DeviceID, "SharedLocalConnector"] = {}
+
+    def __str__(self):
+        return "<Hekr:SharedUDPEndpoint(port %d, %d connectors)>" % (
+            self.key[1],
+            len(self._device_connectors),
+        )
+
+    @property
+    def is_closed(self) -> bool:
+        return self.transport is None or self.transport.is_closing()
+
+    # Connector management
+    def register(self, connector: "SharedLocalConnector", address: Address) -> None:
+        """
+        Route datagrams from address to connector.
+        :param connector: Connector
+        :param address: Resolved device address
+        """
+        self._address_connectors.setdefault(address, []).append(connector)
+        for device_id in connector.devices:
+            self._device_connectors[device_id] = connector
+
+    def unregister(self, connector: "SharedLocalConnector", address: Address) -> None:
+        """
+        Stop routing datagrams to connector. Endpoint is closed once no connectors
+        remain registered.
+        :param connector: Connector
+        :param address: Resolved device address
+        """
+        connectors = self._address_connectors.get(address)
+        if connectors is not None and connector in connectors:
+            connectors.remove(connector)
+            if not connectors:
+                del self._address_connectors[address]
+
+        for device_id in connector.devices:
+            if self._device_connectors.get(device_id) is connector:
+                del self._device_connectors[device_id]
+
+        if not self._address_connectors:
+            self._pool.release(self)
+
+    def sendto(self, data: bytes, address: Address) -> None:
+        if self.is_closed:
+            raise IOError("Endpoint is closed")
+        self.transport.sendto(data, address)
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+    # Protocol methods
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if exc is not None:
+            _LOGGER.warning("Endpoint %s lost connection: %s" % (self, exc))
+
+        self.transport = None
+        self._pool.release(self)
+
+        connectors = set(self._device_connectors.values())
+        self._address_connectors.clear()
+        self._device_connectors.clear()
+        for connector in connectors:
+            connector.endpoint_lost(self)
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        connectors = self._address_connectors.get(addr[:2])
+        if connectors is not None and len(connectors) == 1:
+            connector = connectors[0]
+        else:
+            connector = self._device_connectors.get(_get_device_id(data))
+
+        if connector is None:
+            _LOGGER.debug(
+                "Endpoint %s dropped datagram from unknown source %s", self, addr
+            )
+            return
+
+        connector.feed_response(data)
+
+    def error_received(self, exc: Exception) -> None:
+        _LOGGER.debug("Endpoint %s received an error: %s", self, exc)
+
+
+class UDPEndpointPool:
+    """Registry of shared endpoints, one per address family and device port."""
+
+    def __init__(self):
+        self._endpoints: dict[EndpointKey, SharedUDPEndpoint] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self._endpoints)
+
+    async def acquire(self, host: str, port: int) -> tuple[SharedUDPEndpoint, Address]:
+        """
+        Resolve device address and retrieve (or open) shared endpoint for it.
+        :param host: Device host
+        :param port: Device port
+        :return: Shared endpoint, resolved device address
+        """
+        loop = asyncio.get_running_loop()
+        address_info = await loop.getaddrinfo(host, port, type=socket.SOCK_DGRAM)
+        if not address_info:
+            raise HekrAPIException('Could not resolve address for host "%s"' % host)
+
+        family, _, _, _, sockaddr = address_info[0]
+        key = (family, port)
+
+        async with self._lock:
+            endpoint = self._endpoints.get(key)
+            if endpoint is None or endpoint.is_closed:
+                _LOGGER.debug("Opening shared endpoint for port %d" % port)
+                _, endpoint = await loop.create_datagram_endpoint(
+                    lambda: SharedUDPEndpoint(self, key),
+                    local_addr=("::" if family == socket.AF_INET6 else "0.0.0.0", 0),
+                    family=family,
+                )
+                self._endpoints[key] = endpoint
+
+        return endpoint, sockaddr[:2]
+
+    def release(self, endpoint: SharedUDPEndpoint) -> None:
+        """
+        Close endpoint and remove it from the pool.
+        :param endpoint: Shared endpoint
+        """
+        if self._endpoints.get(endpoint.key) is endpoint:
+            _LOGGER.debug("Closing shared endpoint %s" % endpoint)
+            del self._endpoints[endpoint.key]
+        endpoint.close()
+
+    def close(self) -> None:
+        """Close all endpoints."""
+        for endpoint in list(self._endpoints.values()):
+            self.release(endpoint)
+
+
+class SharedLocalConnector(LocalConnector):
+    """Local connector sending and receiving via a pooled shared endpoint."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        endpoint_pool: UDPEndpointPool,
+        device: Optional[Device] = None,
+        application_id: str = DEFAULT_APPLICATION_ID,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        super().__init__(
+            host, port, device=device, application_id=application_id, timeout=timeout
+        )
+        self._endpoint_pool = endpoint_pool
+        self._shared_endpoint: Optional[SharedUDPEndpoint] = None
+        self._address: Optional[Address] = None
+        self._responses: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+        self._connect_lock = asyncio.Lock()
+        self.receiver: Optional[Callable[[bytes, float], None]] = None
+
+    async def open_connection(self) -> None:
+        # listener and command senders may attempt to connect at the same time
+        async with self._connect_lock:
+            if not self.is_connected:
+                await super().open_connection()
+
+    async def _open_connection(self) -> None:
+        if self.is_connected:
+            raise HekrAPIException("Local endpoint already established")
+        if not self._devices:
+            raise HekrAPIException("Device not set for local endpoint")
+
+        _LOGGER.debug("Opening shared local endpoint on device %s" % self._devices)
+        endpoint, address = await self._endpoint_pool.acquire(self._host, self._port)
+
+        self._responses = asyncio.Queue()
+        self._shared_endpoint = endpoint
+        self._address = address
+        endpoint.register(self, address)
+
+        try:
+            await self.authenticate(ACTION_DEVICE_AUTH_REQUEST)
+        except BaseException:
+            # do not hold endpoint registration for an unreachable device
+            await self.close_connection()
+            raise
+
+        _LOGGER.debug("Authentication request processed, local endpoint is open")
+
+    async def close_connection(self) -> None:
+        endpoint = self._shared_endpoint
+        if endpoint is None:
+            return
+
+        _LOGGER.debug("Closing shared local endpoint on device %s" % self._devices)
+        self._shared_endpoint = None
+        endpoint.unregister(self, self._address)
+        self._responses.put_nowait(None)
+
+    def endpoint_lost(self, endpoint: SharedUDPEndpoint) -> None:
+        """
+        Handle shared endpoint closing underneath the connector.
+        :param endpoint: Shared endpoint
+        """
+        if self._shared_endpoint is endpoint:
+            self._shared_endpoint = None
+            self._responses.put_nowait(None)
+
+    def feed_response(self, data: bytes) -> None:
+        """
+        Hand datagram routed to connector by the shared endpoint over to the receiver,
+        or queue it for reading when no receiver is set.
+        :param data: Datagram contents
+        """
+        if self.receiver is None:
+            self._responses.put_nowait(data)
+        else:
+            self.receiver(data, asyncio.get_running_loop().time())
+
+    async def send_request(self, request_str: str) -> None:
+        _LOGGER.debug("Sending request via %s with content: %s", self, request_str)
+        if self._shared_endpoint is None:
+            raise IOError("Endpoint is closed")
+        self._shared_endpoint.sendto(request_str.encode(), self._address)
+
+    async def read_response(self) -> str:
+        response = await self._responses.get()
+        if response is None:
+            raise IOError("Endpoint is closed")
+        _LOGGER.debug("Received response on %s with content: %s", self, response)
+        return response.decode("utf-8").strip()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._shared_endpoint is not None
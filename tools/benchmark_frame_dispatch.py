@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Benchmark event loop time spent on dispatching a single device frame.
+
+Compares the batched dispatch path of `HekrData.callback_update_entities` with the
+legacy path, which created a task per entity and forced a state refresh from every
+one of them. The legacy path is a copy of the original dispatch and entity update
+code, so that it does not follow later changes to `HekrEntity`. Both paths receive
+the same sequence of `reportData` frames decoded with the power meter protocol, and
+write into a real Home Assistant state machine.
+
+Requires `homeassistant` and `hekrapi` to be installed. Run from `tools` directory.
+"""
+
+import asyncio
+import logging
+import random
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from os.path import abspath, dirname, join
+from typing import Optional
+
+sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+from hekrapi import ACTION_DEVICE_MESSAGE, Device, DeviceResponseState
+from hekrapi.protocols.power_meter import PROTOCOL
+from homeassistant import loader
+from homeassistant.components.binary_sensor.device_condition import DEVICE_CLASS_NONE
+from homeassistant.components.sensor import ATTR_STATE_CLASS, SensorEntity
+from homeassistant.const import (
+    ATTR_DEVICE_CLASS,
+    ATTR_ICON,
+    ATTR_STATE,
+    ATTR_UNIT_OF_MEASUREMENT,
+    CONF_PROTOCOL,
+    STATE_OK,
+    STATE_UNKNOWN,
+)
+from homeassistant.core import HomeAssistant
+
+from custom_components.hekr.const import (
+    ATTR_MONITORED,
+    DOMAIN,
+    PROTOCOL_CMD_RECEIVE,
+    PROTOCOL_CMD_UPDATE,
+    PROTOCOL_DEFAULT,
+    PROTOCOL_SENSORS,
+)
+from custom_components.hekr.hekr_data import HekrData
+from custom_components.hekr.sensor import HekrSensor
+from custom_components.hekr.supported_protocols import POWER_METER
+
+DEVICE_ID = "ESP_2M_BENCHMARK"
+FRAME_COUNT = 2000
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def generate_frames(count: int) -> list[dict]:
+    command = PROTOCOL.get_command("reportData")
+    frames = []
+    for _ in range(count):
+        values = {argument.name: 0 for argument in command.arguments}
+        values.update(
+            {
+                "current_%d" % phase: round(random.uniform(0, 20), 3)
+                for phase in range(1, 4)
+            }
+        )
+        values.update(
+            {
+                "voltage_%d" % phase: round(random.uniform(215, 235), 1)
+                for phase in range(1, 4)
+            }
+        )
+        values["total_active_power"] = round(random.uniform(0, 5), 4)
+        values["current_frequency"] = 50.0
+        frames.append(PROTOCOL.encode(command, values))
+    return frames
+
+
+def create_entities(hass: HomeAssistant, prefix: str) -> list[HekrSensor]:
+    entities = HekrSensor.create_entities(
+        device_id=DEVICE_ID,
+        name=prefix,
+        types=True,
+        configs=POWER_METER[PROTOCOL_SENSORS],
+        update_interval=timedelta(seconds=15),
+    )
+    for entity in entities:
+        entity.hass = hass
+        entity.entity_id = "sensor.%s_%s" % (prefix, entity.unique_id.lower())
+    return entities
+
+
+class LegacySensor(SensorEntity):
+    """Sensor entity with state handling of the original `HekrSensor`."""
+
+    _attr_available = False
+
+    def __init__(self, ent_type: str, name: str, config: dict):
+        super().__init__()
+        self._ent_type = ent_type
+        self._attr_name = name
+        self._config = config
+
+        self._attributes = None
+        self._state = STATE_UNKNOWN
+
+    async def handle_data_update(self, data: dict) -> None:
+        _LOGGER.debug(
+            "Handling data update for %s entity [%s] with data: %s"
+            % (
+                self.__class__.__name__,
+                self.entity_id,
+                data,
+            )
+        )
+
+        state_key = self._config.get(ATTR_STATE)
+        if state_key:
+            if state_key in data:
+                state = data[state_key]
+            else:
+                _LOGGER.error(
+                    'State "%s" for entity type "%s" not found in received data (%s)!'
+                    % (state_key, self._ent_type, data)
+                )
+                state = STATE_UNKNOWN
+        else:
+            state = STATE_OK
+
+        additional_keys = self._config.get(ATTR_MONITORED)
+        attributes = None
+        if additional_keys is True:
+            attributes = OrderedDict()
+            for attribute in sorted(data):
+                if state_key is None or attribute != state_key:
+                    attributes[attribute] = data[attribute]
+
+        elif additional_keys is not None:
+            attributes = OrderedDict()
+            for attribute in sorted(additional_keys):
+                if attribute in data:
+                    attributes[attribute] = data[attribute]
+                else:
+                    _LOGGER.warning(
+                        'Attribute "%s" for entity type "%s" not found in received data (%s)!'
+                        % (attribute, self._ent_type, data)
+                    )
+                    attributes[attribute] = STATE_UNKNOWN
+
+        if (
+            attributes != self._attributes
+            or state != self._state
+            or not self._attr_available
+        ):
+            self._attr_available = True
+            self._state = state
+            self._attributes = attributes
+            await self.async_update_ha_state(force_refresh=True)
+
+    @property
+    def should_poll(self) -> bool:
+        return False
+
+    @property
+    def available(self) -> bool:
+        return self._attr_available
+
+    @property
+    def icon(self) -> Optional[str]:
+        icon = self._config.get(ATTR_ICON)
+        if isinstance(icon, dict):
+            return icon.get(self._state, icon.get(PROTOCOL_DEFAULT))
+        return icon
+
+    @property
+    def state(self) -> Optional[str]:
+        return self._state
+
+    @property
+    def unit_of_measurement(self) -> Optional[str]:
+        return self._config.get(ATTR_UNIT_OF_MEASUREMENT)
+
+    @property
+    def device_state_attributes(self) -> Optional[dict]:
+        base_attributes = {}
+
+        attributes = self._attributes
+        if attributes:
+            base_attributes.update(attributes)
+
+        return base_attributes
+
+    @property
+    def command_update(self) -> str:
+        return self._config.get(PROTOCOL_CMD_UPDATE)
+
+    @property
+    def command_receive(self) -> str:
+        command_receive = self._config.get(PROTOCOL_CMD_RECEIVE)
+        if command_receive is None:
+            return self.command_update
+        return command_receive
+
+    @property
+    def device_class(self) -> Optional[str]:
+        return self._config.get(ATTR_DEVICE_CLASS, DEVICE_CLASS_NONE)
+
+    @property
+    def state_class(self) -> Optional[str]:
+        return self._config.get(ATTR_STATE_CLASS)
+
+
+def create_legacy_entities(hass: HomeAssistant, prefix: str) -> list[LegacySensor]:
+    entities = []
+    for ent_type, config in POWER_METER[PROTOCOL_SENSORS].items():
+        entity = LegacySensor(ent_type, "%s %s" % (prefix, ent_type), config)
+        entity.hass = hass
+        entity.entity_id = "sensor.%s_%s" % (prefix, ent_type)
+        entities.append(entity)
+    return entities
+
+
+async def legacy_dispatch(
+    entities: list[LegacySensor], command_name: str, attributes: dict
+) -> None:
+    tasks = [
+        asyncio.create_task(entity.handle_data_update(attributes))
+        for entity in entities
+        if entity.command_receive == command_name
+    ]
+
+    if tasks:
+        _LOGGER.debug(
+            'Performing update on %d entities for command "%s"'
+            % (len(tasks), command_name)
+        )
+        await asyncio.wait(tasks)
+        _LOGGER.debug("Update complete!")
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        loader.async_setup(hass)
+
+        hekr_data = HekrData(hass)
+        hekr_data.poll_scheduler.stop()
+        hekr_data.devices_config_entries[DEVICE_ID] = {CONF_PROTOCOL: "power_meter"}
+        hass.data[DOMAIN] = hekr_data
+
+        device = Device(DEVICE_ID, control_key="", protocol=PROTOCOL)
+
+        batched_entities = create_entities(hass, "batched")
+        for entity in batched_entities:
+            await entity.async_added_to_hass()
+
+        legacy_entities = create_legacy_entities(hass, "legacy")
+
+        frames = generate_frames(FRAME_COUNT)
+
+        started_at = time.perf_counter()
+        for frame in frames:
+            command, data, _ = PROTOCOL.decode(frame)
+            await legacy_dispatch(
+                legacy_entities, command.name, POWER_METER["filter"](data)
+            )
+        legacy_time = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        for message_id, frame in enumerate(frames):
+            result = hekr_data.callback_update_entities(
+                device,
+                message_id,
+                DeviceResponseState.SUCCESS,
+                ACTION_DEVICE_MESSAGE,
+                PROTOCOL.decode(frame),
+            )
+            # dispatch callback is a coroutine function when driven by hekrapi listeners
+            if result is not None:
+                await result
+        batched_time = time.perf_counter() - started_at
+
+        await hass.async_stop(force=True)
+
+    legacy_per_frame = legacy_time / FRAME_COUNT * 1e6
+    batched_per_frame = batched_time / FRAME_COUNT * 1e6
+    print(
+        "Entities per frame: %d"
+        % sum(entity.command_receive == "reportData" for entity in legacy_entities)
+    )
+    print("Legacy dispatch:    %8.1f us/frame" % legacy_per_frame)
+    print("Batched dispatch:   %8.1f us/frame" % batched_per_frame)
+    print("Reduction:          %8.1f %%" % (100 * (1 - batched_time / legacy_time)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
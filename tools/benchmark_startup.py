@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark event loop time spent on subscribing entities during startup.
+
+Compares deferred per-device reconciliation of updaters and listeners with the
+legacy path, which walked every device on each entity subscription. Both paths
+subscribe all power meter sensors of the same set of local devices.
+
+Requires `homeassistant` and `hekrapi` to be installed. Run from `tools` directory.
+"""
+
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from os.path import abspath, dirname, join
+
+sys.path.insert(0, abspath(join(dirname(__file__), "..")))
+
+from hekrapi import DeviceID
+from homeassistant import loader
+from homeassistant.const import CONF_DEVICE_ID, CONF_HOST, CONF_PROTOCOL
+from homeassistant.core import HomeAssistant
+
+from custom_components.hekr.const import CONF_CONTROL_KEY, PROTOCOL_SENSORS
+from custom_components.hekr.hekr_data import HekrData
+from custom_components.hekr.sensor import HekrSensor
+from custom_components.hekr.supported_protocols import POWER_METER
+
+DEVICE_COUNT = 500
+
+
+class LegacyHekrData(HekrData):
+    """Reconciles connections of every device on each subscription change."""
+
+    def schedule_refresh(self, device_id: DeviceID) -> None:
+        for refresh_device_id in self.device_entities:
+            self._refresh_device_updater(refresh_device_id)
+        for device in self.devices.values():
+            self._refresh_connector_listener(device.connector)
+
+
+def create_devices(hekr_data: HekrData) -> list[tuple[DeviceID, list[HekrSensor]]]:
+    devices = []
+    for number in range(DEVICE_COUNT):
+        device_id = "ESP_2M_BENCHMARK%04d" % number
+        hekr_data.create_local_device(
+            {
+                CONF_DEVICE_ID: device_id,
+                CONF_HOST: "127.0.0.1",
+                CONF_PROTOCOL: "power_meter",
+                CONF_CONTROL_KEY: "",
+            }
+        )
+        entities = HekrSensor.create_entities(
+            device_id=device_id,
+            name=device_id,
+            types=True,
+            configs=POWER_METER[PROTOCOL_SENSORS],
+            update_interval=timedelta(seconds=15),
+        )
+        devices.append((device_id, entities))
+    return devices
+
+
+async def measure_startup(hekr_data: HekrData) -> tuple[float, int]:
+    devices = create_devices(hekr_data)
+    entities_count = sum(len(entities) for _, entities in devices)
+
+    started_at = time.perf_counter()
+    for device_id, entities in devices:
+        for entity in entities:
+            hekr_data.add_entity(device_id, entity)
+    # run collapsed refresh right away instead of waiting for its timer
+    hekr_data.refresh_connections()
+    elapsed = time.perf_counter() - started_at
+
+    assert len(hekr_data.device_updaters) == DEVICE_COUNT
+    await hekr_data.callback_homeassistant_stop(None)
+
+    return elapsed, entities_count
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        loader.async_setup(hass)
+
+        legacy_time, entities_count = await measure_startup(LegacyHekrData(hass))
+        deferred_time, _ = await measure_startup(HekrData(hass))
+
+        await hass.async_stop(force=True)
+
+    print("Devices:            %8d" % DEVICE_COUNT)
+    print("Entities:           %8d" % entities_count)
+    print("Legacy startup:     %8.1f ms" % (legacy_time * 1e3))
+    print("Deferred startup:   %8.1f ms" % (deferred_time * 1e3))
+    print("Reduction:          %8.1f %%" % (100 * (1 - deferred_time / legacy_time)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())